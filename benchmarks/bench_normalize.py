@@ -0,0 +1,90 @@
+"""
+Benchmark de la normalizacion de tipos del loader sobre los Excel de data/excel/.
+
+Compara la version anterior (astype(str) + replace por columna) contra _normalize_types
+actual: tiempo por dataset, pico de memoria asignada durante la normalizacion (tracemalloc)
+y memoria final de las tablas (memory_usage(deep=True)).
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.bench_normalize [--repeat 20]
+"""
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+import pandas as pd
+
+from src.config import load_apps_config, resolve_dataset
+from src.data.excel_loader import BASE_COLS, HA_COLS, _normalize_types, _parse_workbook
+
+def _normalize_types_legacy(df: pd.DataFrame) -> pd.DataFrame:
+    # Copia de la implementacion previa, como referencia.
+    df = df.copy()
+    df.columns = [str(c).strip() for c in df.columns]
+    for c in ["Split", "Station"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+    if "ID" in df.columns:
+        df["ID"] = pd.to_numeric(df["ID"], errors="coerce").astype("Int64")
+    for c in df.columns:
+        if df[c].dtype == "object":
+            df[c] = df[c].astype(str).str.strip()
+            # Mismo efecto que replace({"nan": None, ...}); replace con dict falla en pandas 2.2 con copy-on-write activo.
+            df[c] = df[c].mask(df[c].isin(["nan", "None", "NaT"]), None)
+    return df
+
+def _raw_tables(cfg: dict) -> dict[str, list[pd.DataFrame]]:
+    out = {}
+    for a_key, a_cfg in cfg.get("apps", {}).items():
+        for d_key in (a_cfg.get("datasets", {}) or {}):
+            ds = resolve_dataset(cfg, a_key, d_key)
+            base_sheet = ds.get("base_sheet", "Flat Base")
+            ha_sheet = ds.get("ha_sheet", " (H.A.) Flat Base")
+            sheets = (
+                (base_sheet, 0, tuple(BASE_COLS), False),
+                (ha_sheet, int(ds.get("ha_header_row", 1)), tuple(HA_COLS), False),
+            )
+            raw = _parse_workbook(ds["file_abs"], sheets)
+            out[f"{a_key}::{d_key}"] = [raw[base_sheet], raw[ha_sheet]]
+    return out
+
+def _measure(fn, frames: list[pd.DataFrame], repeat: int) -> tuple[float, int, int]:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for f in frames:
+            fn(f)
+    ms = (time.perf_counter() - t0) * 1000 / repeat
+
+    tracemalloc.start()
+    results = [fn(f) for f in frames]
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = sum(int(r.memory_usage(deep=True).sum()) for r in results)
+    return ms, peak, size
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    raw = _raw_tables(load_apps_config())
+    header = f'{"dataset":32} {"legacy ms":>10} {"new ms":>8} {"legacy peak KB":>15} {"new peak KB":>12} {"legacy KB":>10} {"new KB":>8}'
+    print(header)
+    print("-" * len(header))
+    totals = [0.0, 0.0, 0, 0, 0, 0]
+    for name, frames in raw.items():
+        l_ms, l_peak, l_size = _measure(_normalize_types_legacy, frames, args.repeat)
+        n_ms, n_peak, n_size = _measure(_normalize_types, frames, args.repeat)
+        for i, v in enumerate([l_ms, n_ms, l_peak, n_peak, l_size, n_size]):
+            totals[i] += v
+        print(f"{name:32} {l_ms:10.2f} {n_ms:8.2f} {l_peak / 1024:15.0f} {n_peak / 1024:12.0f} {l_size / 1024:10.0f} {n_size / 1024:8.0f}")
+    print("-" * len(header))
+    print(
+        f'{"TOTAL":32} {totals[0]:10.2f} {totals[1]:8.2f} {totals[2] / 1024:15.0f} '
+        f"{totals[3] / 1024:12.0f} {totals[4] / 1024:10.0f} {totals[5] / 1024:8.0f}"
+    )
+
+if __name__ == "__main__":
+    main()
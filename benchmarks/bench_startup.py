@@ -0,0 +1,108 @@
+"""
+Benchmark de arranque: tiempo de import por modulo y tiempo hasta el primer pintado de una pagina.
+
+Cada medicion corre en un proceso nuevo (imports en frio, como despues de un deploy):
+  - imports: ms de `import <modulo>` para lo liviano (config, formatting) y lo pesado (loader, logica)
+  - paginas: corre la pagina con AppTest y lee los tiempos de rerun de la sesion:
+      shell  = set_page_config + titulo + selector de archivo (lo primero que ve el operador)
+      pagina = rerun completo con la tabla
+    en dos escenarios: "frio" (sin snapshot, parsea el Excel) y "tibio" (snapshot ya guardado).
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.bench_startup [--repeat 5] [--page pages/1_Split_View.py] [--json salida.json]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+LIGHT_MODULES = ["streamlit", "src.config", "src.ui.formatting"]
+HEAVY_MODULES = ["pandas", "src.data.excel_loader", "src.logic.split_view", "src.ui.split_render", "src.data.warmup"]
+
+def _import_ms(module: str) -> float:
+    code = (
+        "import time; t = time.perf_counter(); "
+        f"import {module}; print((time.perf_counter() - t) * 1000)"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+def _child(page: str) -> None:
+    # Proceso hijo: imports de Streamlit + corrida de la pagina, todo medido desde cero.
+    t0 = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(page, default_timeout=120)
+    at.run()
+    total = (time.perf_counter() - t0) * 1000
+    times = {r["Alcance"]: r["ms"] for r in at.session_state["_rerun_times"]} if "_rerun_times" in at.session_state else {}
+    print(json.dumps({"total": round(total, 1), "shell": times.get("shell"), "pagina": times.get("pagina"), "errors": len(at.exception)}))
+
+def _page_run(page: str, snapshot_dir: str) -> dict:
+    env = {**os.environ, "MSPLITS_SNAPSHOT_DIR": snapshot_dir, "PYTHONPATH": str(ROOT)}
+    out = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_startup", "--child", page],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def _median(values: list) -> float | None:
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 1) if values else None
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--page", default="pages/1_Split_View.py")
+    parser.add_argument("--json", help="guarda el resultado (medianas) en este archivo")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        _child(args.child)
+        return
+
+    result: dict = {"imports": {}, "pages": {}}
+    print(f'{"modulo":28} {"ms (mediana)":>12}')
+    print("-" * 41)
+    for module in LIGHT_MODULES + HEAVY_MODULES:
+        ms = _median([_import_ms(module) for _ in range(args.repeat)])
+        result["imports"][module] = ms
+        print(f"{module:28} {ms:12.1f}")
+
+    print()
+    header = f'{"escenario":10} {"shell ms":>9} {"pagina ms":>10} {"proceso ms":>11}'
+    print(f"{args.page}")
+    print(header)
+    print("-" * len(header))
+    with tempfile.TemporaryDirectory() as warm_dir:
+        runs: dict[str, list[dict]] = {"frio": [], "tibio": []}
+        for _ in range(args.repeat):
+            with tempfile.TemporaryDirectory() as cold_dir:
+                runs["frio"].append(_page_run(args.page, cold_dir))
+        _page_run(args.page, warm_dir)  # deja el snapshot guardado
+        for _ in range(args.repeat):
+            runs["tibio"].append(_page_run(args.page, warm_dir))
+
+    for name, items in runs.items():
+        if any(r["errors"] for r in items):
+            print(f"{name}: la pagina lanzo excepciones", file=sys.stderr)
+        med = {k: _median([r[k] for r in items]) for k in ("shell", "pagina", "total")}
+        result["pages"][name] = med
+        print(f'{name:10} {med["shell"] or 0:9.1f} {med["pagina"] or 0:10.1f} {med["total"] or 0:11.1f}')
+
+    if args.json:
+        result.update({"page": args.page, "repeat": args.repeat, "python": sys.version.split()[0]})
+        Path(args.json).write_text(json.dumps(result, indent=2), encoding="utf-8")
+
+if __name__ == "__main__":
+    main()
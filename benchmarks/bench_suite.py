@@ -0,0 +1,268 @@
+"""
+Suite de benchmarks de los caminos calientes sobre los Excel reales (apps.yml) y las copias de tmp/.
+
+Por dataset mide:
+  load_cold      load_dataset_tables sin store ni snapshot (parseo completo del Excel + indices)
+  load_snapshot  load_dataset_tables sin store, con snapshot en disco
+  load_warm      load_dataset_tables con el dataset ya en memoria
+  split_view     build_split_view para cada (split, station), vista normal y extendida
+  suggest        suggest_sites con una mezcla de consultas (prefijos, palabras, minusculas, sin resultado)
+  search_exact   search_site_exact con nombres reales, con y sin filtro de split
+  compare        compare_splits_for_station para cada par de splits consecutivos y cada station
+
+Reporta percentiles de latencia (p50/p95/p99/max, en ms) y el pico de memoria asignada
+(tracemalloc, en una corrida aparte para no inflar los tiempos). Compara contra un baseline
+guardado y termina con codigo 1 si algo empeora mas que la tolerancia.
+
+Uso (desde la raiz del proyecto):
+    python -m benchmarks.bench_suite [--repeat 3] [--dataset omnia] [--json salida.json]
+    python -m benchmarks.bench_suite --save-baseline      # guarda benchmarks/baseline.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from src.config import config_datasets, load_apps_config, project_root
+from src.data import store
+from src.data.excel_loader import _dataset_spec, load_dataset_tables
+from src.logic.change_split import compare_splits_for_station
+from src.logic.site_search import search_site_exact, suggest_sites
+from src.logic.split_view import build_split_view, get_splits, get_stations_for_split
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+# Por debajo de estas diferencias absolutas no se considera regresion (ruido del reloj / del GC).
+MIN_DELTA_MS = 0.05
+MIN_DELTA_KB = 256
+QUERIES_PER_DATASET = 200
+SEED = 20240301
+
+def _tmp_config() -> dict:
+    # Las copias de tmp/ no estan en apps.yml: se arman como una app aparte con las hojas por defecto.
+    files = sorted((project_root() / "tmp").glob("*.xlsx"))
+    datasets = {
+        f.stem: {"label": f.stem, "file": f"tmp/{f.name}", "important_info_sheet": "Important Info!"}
+        for f in files
+    }
+    return {"apps": {"tmp": {"label": "tmp", "datasets": datasets}}}
+
+def _targets(only: str | None) -> list[tuple[dict, str, str]]:
+    out = []
+    for cfg in (load_apps_config(), _tmp_config()):
+        for ds in config_datasets(cfg):
+            if only and only not in ds.id:
+                continue
+            if Path(ds.file_abs).exists():
+                out.append((cfg, ds.app_key, ds.dataset_key))
+    return out
+
+def _timed(fn, *args, **kwargs) -> float:
+    t0 = time.perf_counter_ns()
+    fn(*args, **kwargs)
+    return (time.perf_counter_ns() - t0) / 1e6
+
+def _peak_kb(fn) -> float:
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def _stats(samples: list[float], peak_kb: float) -> dict:
+    a = np.asarray(samples, dtype=float)
+    p50, p95, p99 = np.percentile(a, [50, 95, 99])
+    return {
+        "n": int(a.size),
+        "p50": round(float(p50), 4),
+        "p95": round(float(p95), 4),
+        "p99": round(float(p99), 4),
+        "max": round(float(a.max()), 4),
+        "peak_kb": round(peak_kb, 1),
+    }
+
+def _evict(cfg: dict, app_key: str, dataset_key: str) -> None:
+    _, _, key = _dataset_spec(cfg, app_key, dataset_key)
+    store._ENTRIES.pop(key, None)
+
+def _bench_loads(cfg: dict, app_key: str, dataset_key: str, repeat: int) -> dict[str, dict]:
+    load = lambda: load_dataset_tables(cfg, app_key, dataset_key)
+    previous = os.environ.get("MSPLITS_SNAPSHOT_DIR")
+    try:
+        with tempfile.TemporaryDirectory() as snap_dir:
+            os.environ["MSPLITS_SNAPSHOT_DIR"] = snap_dir
+            cold = []
+            for _ in range(repeat):
+                for f in Path(snap_dir).iterdir():
+                    f.unlink()
+                _evict(cfg, app_key, dataset_key)
+                cold.append(_timed(load))
+            for f in Path(snap_dir).iterdir():
+                f.unlink()
+            _evict(cfg, app_key, dataset_key)
+            cold_peak = _peak_kb(load)
+
+            # Con el snapshot que dejo la ultima carga en frio.
+            snap = []
+            for _ in range(repeat):
+                _evict(cfg, app_key, dataset_key)
+                snap.append(_timed(load))
+            _evict(cfg, app_key, dataset_key)
+            snap_peak = _peak_kb(load)
+
+            warm = [_timed(load) for _ in range(repeat * 100)]
+            warm_peak = _peak_kb(load)
+    finally:
+        if previous is None:
+            os.environ.pop("MSPLITS_SNAPSHOT_DIR", None)
+        else:
+            os.environ["MSPLITS_SNAPSHOT_DIR"] = previous
+    return {
+        "load_cold": _stats(cold, cold_peak),
+        "load_snapshot": _stats(snap, snap_peak),
+        "load_warm": _stats(warm, warm_peak),
+    }
+
+def _query_mix(names: list[str], rng: random.Random) -> list[str]:
+    # Lo que escribe un operador: prefijos, una palabra del nombre, todo en minusculas, o algo que no existe.
+    queries = []
+    for _ in range(QUERIES_PER_DATASET):
+        name = rng.choice(names)
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append(name[: rng.randint(2, min(8, max(2, len(name))))])
+        elif kind < 0.7:
+            words = [w for w in name.split() if len(w) > 2] or [name]
+            queries.append(rng.choice(words))
+        elif kind < 0.9:
+            queries.append(name.lower())
+        else:
+            queries.append(f"zq{rng.randint(0, 999)}x")
+    return queries
+
+def _bench_queries(tables: dict, rounds: int) -> dict[str, dict]:
+    df = tables["base"]
+    split_index = tables.get("split_index")
+    site_index = tables.get("site_index")
+    splits = get_splits(df, index=split_index)
+    rng = random.Random(SEED)
+    names = site_index["names"] if site_index else []
+
+    pairs = [(s, st) for s in splits for st in get_stations_for_split(df, s)]
+    views = [(s, st, ext) for s, st in pairs for ext in (False, True)]
+
+    def sweep_views() -> list[float]:
+        return [_timed(build_split_view, df, s, st, ext, index=split_index) for s, st, ext in views]
+
+    queries = _query_mix(names, rng) if names else []
+    filters = [rng.choice(splits) if rng.random() < 0.5 else None for _ in queries]
+    exact = [rng.choice(names) for _ in queries] if names else []
+
+    def sweep_suggest() -> list[float]:
+        return [_timed(suggest_sites, df, q, index=site_index, split=f) for q, f in zip(queries, filters)]
+
+    def sweep_exact() -> list[float]:
+        return [_timed(search_site_exact, df, n, index=site_index, split=f) for n, f in zip(exact, filters)]
+
+    compares = [
+        (a, b, st)
+        for a, b in zip(splits, splits[1:])
+        for st in range(1, max(int(a), int(b)) + 1)
+    ]
+
+    def sweep_compare() -> list[float]:
+        return [_timed(compare_splits_for_station, df, a, b, st) for a, b, st in compares]
+
+    out = {}
+    for name, sweep in (
+        ("split_view", sweep_views),
+        ("suggest", sweep_suggest),
+        ("search_exact", sweep_exact),
+        ("compare", sweep_compare),
+    ):
+        sweep()  # calentamiento (imports perezosos, caches de pandas)
+        samples = [ms for _ in range(rounds) for ms in sweep()]
+        if samples:
+            out[name] = _stats(samples, _peak_kb(sweep))
+    return out
+
+def _compare(current: dict, baseline: dict, tolerance: float) -> list[str]:
+    problems = []
+    for key, cur in current.items():
+        base = baseline.get(key)
+        if base is None:
+            continue
+        for field in ("p50", "p95"):
+            if cur[field] > base[field] * (1 + tolerance) and cur[field] - base[field] > MIN_DELTA_MS:
+                problems.append(f"{key}: {field} {base[field]:.3f} -> {cur[field]:.3f} ms")
+        if cur["peak_kb"] > base["peak_kb"] * (1 + tolerance) and cur["peak_kb"] - base["peak_kb"] > MIN_DELTA_KB:
+            problems.append(f"{key}: pico {base['peak_kb']:.0f} -> {cur['peak_kb']:.0f} KB")
+    return problems
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="cargas en frio/snapshot por dataset")
+    parser.add_argument("--rounds", type=int, default=3, help="vueltas de cada barrido de vistas/busquedas")
+    parser.add_argument("--dataset", help="solo datasets cuyo id (app::dataset) contenga este texto")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="guarda el resultado como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="empeoramiento relativo permitido (0.25 = 25%%)")
+    parser.add_argument("--json", help="guarda el resultado completo en este archivo")
+    args = parser.parse_args()
+    # Mismo modo de pandas que la app (el baseline se midio asi).
+    store.enable_copy_on_write()
+
+    baseline_path = Path(args.baseline)
+    baseline = {}
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8")).get("results", {})
+
+    results: dict[str, dict] = {}
+    header = f'{"benchmark":14} {"dataset":32} {"n":>6} {"p50":>9} {"p95":>9} {"p99":>9} {"max":>9} {"pico KB":>9} {"vs base":>8}'
+    print(header)
+    print("-" * len(header))
+    for cfg, app_key, dataset_key in _targets(args.dataset):
+        ds_id = f"{app_key}::{dataset_key}"
+        rows = _bench_loads(cfg, app_key, dataset_key, args.repeat)
+        rows.update(_bench_queries(load_dataset_tables(cfg, app_key, dataset_key), args.rounds))
+        for bench, s in rows.items():
+            key = f"{bench}|{ds_id}"
+            results[key] = s
+            base = baseline.get(key)
+            ratio = f"{s['p50'] / base['p50']:.2f}x" if base and base["p50"] else "-"
+            print(
+                f"{bench:14} {ds_id:32} {s['n']:6d} {s['p50']:9.3f} {s['p95']:9.3f} "
+                f"{s['p99']:9.3f} {s['max']:9.3f} {s['peak_kb']:9.0f} {ratio:>8}"
+            )
+
+    payload = {"python": sys.version.split()[0], "repeat": args.repeat, "rounds": args.rounds, "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"\nBaseline guardado en {baseline_path}")
+        return
+
+    problems = _compare(results, baseline, args.tolerance)
+    if not baseline:
+        print("\nSin baseline: correr con --save-baseline para guardar uno.")
+    elif problems:
+        print(f"\nRegresiones (tolerancia {args.tolerance:.0%}):")
+        for p in problems:
+            print(f"  {p}")
+        sys.exit(1)
+    else:
+        print(f"\nSin regresiones contra {baseline_path} (tolerancia {args.tolerance:.0%}).")
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,126 @@
 import streamlit as st
 from src.config import load_apps_config
-from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher
-from src.data.excel_loader import load_dataset_tables
-from src.logic.split_view import get_splits, get_stations_for_split, build_split_view
+from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, sidebar_warmup_status, sidebar_dataset_changes, rerun_started, record_rerun, sidebar_rerun_debug, load_tables_progressive
 
 SHARED_SPLIT_KEY = "shared_selected_split"
 SHARED_STATION_KEY = "shared_selected_station"
 SPLIT_WIDGET_KEY = "split_view_selected_split"
 STATION_WIDGET_KEY = "split_view_selected_station"
-
-def _url_or_none(value):
-    if value is None:
-        return None
-    s = str(value).strip()
-    if not s or s in {"-", "None", "nan", "NaT"}:
-        return None
-    s_lower = s.lower()
-    if s_lower.startswith("http://") or s_lower.startswith("https://"):
-        return s
-    return None
-
-def _site_alert_style(value) -> str:
-    s = str(value or "").upper()
-    if "(NO TOURS)" in s:
-        return "color: #c1121f; font-weight: 700;"
-    return ""
-
+EXTENDED_WIDGET_KEY = "split_view_extended"
+HA_WIDGET_KEY = "split_view_show_ha"
+OVERVIEW_WIDGET_KEY = "split_view_overview"
+BLOCK_WIDGET_KEY = "split_view_overview_block"
+
+def _split_overview(tables: dict, split: int):
+    # Pivote cacheado por (version, split); con muchas stations se muestra por bloques de columnas.
+    render = prepared_split_overview(tables, split)
+    display = render["display"]
+    if display.empty:
+        st.info("Este split no tiene sitios.")
+        return
+    blocks = list(render["blocks"])
+    cols = list(display.columns)
+    if len(blocks) > 1:
+        if st.session_state.get(BLOCK_WIDGET_KEY) not in blocks:
+            st.session_state[BLOCK_WIDGET_KEY] = blocks[0]
+        block = st.radio("Stations", blocks, key=BLOCK_WIDGET_KEY, horizontal=True)
+        cols = render["blocks"][block]
+
+    left, right = st.columns([1, 1])
+    with left:
+        st.metric("Split seleccionado", split)
+    with right:
+        st.metric("Sitios", sum(render["sites"].values()))
+    st.caption("Cada celda lista los sitios de la station a esa hora. Entre parentesis, sitios por station.")
+    st.dataframe(
+        display[cols],
+        use_container_width=True,
+        hide_index=True,
+        height=min(OVERVIEW_HEIGHT, 36 * (len(display) + 1) + 3),
+        column_config=render["column_config"],
+    )
+
+@st.fragment
+def _split_table(cfg: dict, app_key: str, dataset_key: str):
+    # Split, station y vista extendida viven dentro del fragmento: cambiarlos solo re-ejecuta esta tabla.
+    started = rerun_started()
+    tables = load_tables_progressive(cfg, app_key, dataset_key)
+    df = tables["base"]
+    split_index = tables.get("split_index")
+
+    splits = get_splits(df, index=split_index)
+    if not splits:
+        st.error("No se encontraron splits en el dataset.")
+        return
+
+    if st.session_state.get(SHARED_SPLIT_KEY) not in splits:
+        st.session_state[SHARED_SPLIT_KEY] = splits[0]
+    if st.session_state.get(SPLIT_WIDGET_KEY) not in splits:
+        st.session_state[SPLIT_WIDGET_KEY] = st.session_state[SHARED_SPLIT_KEY]
+    if EXTENDED_WIDGET_KEY not in st.session_state:
+        st.session_state[EXTENDED_WIDGET_KEY] = True
+
+    c_split, c_station, c_extended, c_ha, c_overview = st.columns([1, 1, 1, 1, 1])
+    with c_split:
+        split = st.selectbox("Split (# operadores)", splits, key=SPLIT_WIDGET_KEY)
+    st.session_state[SHARED_SPLIT_KEY] = split
+    with c_extended:
+        extended = st.checkbox("Vista extendida", key=EXTENDED_WIDGET_KEY)
+    with c_overview:
+        overview = st.toggle("Split completo", key=OVERVIEW_WIDGET_KEY, help="Todas las stations del split en una tabla Hora x Station")
+    if overview:
+        # Sin selector de station: se ve todo el split y se exporta completo.
+        _split_overview(tables, split)
+        split_export_buttons(tables, split, None, extended)
+        record_rerun("tabla", started)
+        return
+    stations = get_stations_for_split(df, split)
+    if st.session_state.get(SHARED_STATION_KEY) not in stations:
+        st.session_state[SHARED_STATION_KEY] = stations[0]
+    if st.session_state.get(STATION_WIDGET_KEY) not in stations:
+        st.session_state[STATION_WIDGET_KEY] = st.session_state[SHARED_STATION_KEY]
+    with c_station:
+        station = st.selectbox("Station", stations, key=STATION_WIDGET_KEY)
+    st.session_state[SHARED_STATION_KEY] = station
+    with c_ha:
+        show_ha = st.checkbox("Mostrar H.A.", key=HA_WIDGET_KEY)
+
+    ha = None
+    if show_ha:
+        # La hoja H.A. se lee recien aca, la primera vez que alguien la pide para esta version del Excel.
+        with st.spinner("Cargando hoja H.A..."):
+            ha = load_ha_model(cfg, app_key, dataset_key)
+
+    # Vista, links, estilos y column_config salen del cache compartido por (version, split, station, vista).
+    render = prepared_split_view(tables, split, station, extended, ha=ha)
+
+    left, right = st.columns([1, 1])
+    with left:
+        st.metric("Station", station)
+    with right:
+        st.metric("Split seleccionado", split)
+
+    st.caption("Los links se muestran completos. Haz clic para abrir.")
+    st.dataframe(
+        styled_split_view(render),
+        use_container_width=True,
+        hide_index=True,
+        height=render["height"],
+        column_config=render["column_config"],
+    )
+    if ha is not None:
+        ha_rows = ha_view(ha, split, station)
+        st.subheader(f"H.A. {split} - Station {station}")
+        if ha_rows.empty:
+            st.info("Esta station no tiene sitios en el reparto H.A. de este split.")
+        else:
+            st.dataframe(ha_rows, use_container_width=True, hide_index=True)
+
+    # Los archivos se arman solo al pedirlos (boton "Preparar") y quedan cacheados por version.
+    split_export_buttons(tables, split, station, extended)
+    record_rerun("tabla", started)
+
+page_started = rerun_started()
 st.set_page_config(page_title="Split View", layout="wide")
 inject_base_css()
 
@@ -33,6 +128,21 @@ cfg = load_apps_config()
 sidebar_app_dataset_picker(cfg)
 
 st.title("Split View")
+record_rerun("shell", page_started)
+
+# Lo pesado (pandas, loader, hilos de precarga) se importa despues de pintar titulo y selector.
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, prefetch_twin
+from src.data.watcher import start_watcher
+from src.logic.split_view import get_splits, get_stations_for_split
+from src.ui.split_render import OVERVIEW_HEIGHT, prepared_split_overview, prepared_split_view, styled_split_view
+from src.ui.export import split_export_buttons
+from src.data.excel_loader import load_ha_model
+from src.logic.ha import ha_view
+
+enable_copy_on_write()
+start_warmup(cfg)
+start_watcher(cfg)
 
 app_key = st.session_state.get("app_key")
 dataset_key = st.session_state.get("dataset_key")
@@ -41,78 +151,12 @@ if not app_key or not dataset_key:
     st.warning("Selecciona un archivo Excel para continuar.")
     st.stop()
 
-if "split_view_extended" not in st.session_state:
-    st.session_state["split_view_extended"] = True
-extended = st.sidebar.checkbox("Vista extendida", key="split_view_extended")
-
-tables = load_dataset_tables(cfg, app_key, dataset_key)
-df = tables["base"]
-
-splits = get_splits(df)
-if not splits:
-    st.error("No se encontraron splits en el dataset.")
-    st.stop()
+prefetch_twin(cfg, app_key, dataset_key)
 
-if st.session_state.get(SHARED_SPLIT_KEY) not in splits:
-    st.session_state[SHARED_SPLIT_KEY] = splits[0]
-if st.session_state.get(SPLIT_WIDGET_KEY) not in splits:
-    st.session_state[SPLIT_WIDGET_KEY] = st.session_state[SHARED_SPLIT_KEY]
-
-split = st.sidebar.selectbox("Split (# operadores)", splits, key=SPLIT_WIDGET_KEY)
-st.session_state[SHARED_SPLIT_KEY] = split
-stations = get_stations_for_split(df, split)
-if st.session_state.get(SHARED_STATION_KEY) not in stations:
-    st.session_state[SHARED_STATION_KEY] = stations[0]
-if st.session_state.get(STATION_WIDGET_KEY) not in stations:
-    st.session_state[STATION_WIDGET_KEY] = st.session_state[SHARED_STATION_KEY]
-
-station = st.sidebar.selectbox("Station", stations, key=STATION_WIDGET_KEY)
-st.session_state[SHARED_STATION_KEY] = station
 sidebar_season_switcher()
+sidebar_warmup_status(cfg)
+sidebar_dataset_changes(app_key, dataset_key)
 
-view = build_split_view(df, split=split, station=station, extended=extended)
-
-left, right = st.columns([1, 1])
-with left:
-    st.metric("Station", station)
-with right:
-    st.metric("Split seleccionado", split)
-
-display = view.copy()
-for url_col in ["SIG Tools", "Map"]:
-    if url_col in display.columns:
-        display[url_col] = display[url_col].map(_url_or_none)
-
-column_config = {
-    "Hour": st.column_config.TextColumn("Hour", width="small"),
-    "Time": st.column_config.TextColumn("Time", width="small"),
-    "Site": st.column_config.TextColumn("Site", width="large"),
-    "Drop time": st.column_config.TextColumn("Drop time", width="small"),
-    "SUNDAY (D.T.)": st.column_config.TextColumn("SUNDAY (D.T.)", width="small"),
-    "Gates": st.column_config.TextColumn("Gates", width="small"),
-    "Entrances": st.column_config.TextColumn("Entrances", width="small"),
-    "LPR": st.column_config.TextColumn("LPR", width="small"),
-    "PTZ": st.column_config.TextColumn("PTZ", width="small"),
-    "Important Cameras": st.column_config.TextColumn("Important Cameras", width="medium"),
-    "Notes*": st.column_config.TextColumn("Notes*", width="small"),
-    "ID": st.column_config.NumberColumn("ID", width="small"),
-}
-if "SIG Tools" in display.columns:
-    column_config["SIG Tools"] = st.column_config.LinkColumn("SIG Tools", width="small")
-if "Map" in display.columns:
-    column_config["Map"] = st.column_config.LinkColumn("Map", width="small")
-
-# Sin tope superior: evita scroll interno en la tabla y deja el scroll en la pagina.
-table_height = max(360, 36 * (len(display) + 1))
-styled = display.style
-if "Site" in display.columns:
-    styled = styled.map(_site_alert_style, subset=["Site"])
-    no_tours_count = int(display["Site"].fillna("").astype(str).str.upper().str.contains("(NO TOURS)", regex=False).sum())
-st.caption("Los links se muestran completos. Haz clic para abrir.")
-st.dataframe(
-    styled,
-    use_container_width=True,
-    hide_index=True,
-    height=table_height,
-    column_config={k: v for k, v in column_config.items() if k in display.columns},
-)
+_split_table(cfg, app_key, dataset_key)
+record_rerun("pagina", page_started)
+sidebar_rerun_debug()
@@ -0,0 +1,104 @@
+import streamlit as st
+from src.config import dataset_config, load_apps_config
+from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, sidebar_warmup_status, sidebar_dataset_changes, download_button_df, load_tables_progressive
+
+MODE_SAME_FILE = "same_file"
+MODE_SEASONS = "seasons"
+MODE_LABELS = {
+    MODE_SAME_FILE: "Cambio de split (mismo archivo)",
+    MODE_SEASONS: "Mismo split entre temporadas",
+}
+
+st.set_page_config(page_title="Cambio de split", layout="wide")
+inject_base_css()
+
+cfg = load_apps_config()
+sidebar_app_dataset_picker(cfg)
+
+st.title("Cambio de split")
+
+# Lo pesado (pandas, loader, hilos de precarga) se importa despues de pintar titulo y selector.
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, prefetch_twin, twin_dataset
+from src.data.watcher import start_watcher
+from src.logic.split_view import get_splits
+from src.logic.change_split import diff_splits, diff_station_summary
+
+enable_copy_on_write()
+start_warmup(cfg)
+start_watcher(cfg)
+
+app_key = st.session_state.get("app_key")
+dataset_key = st.session_state.get("dataset_key")
+
+if not app_key or not dataset_key:
+    st.warning("Selecciona un archivo Excel para continuar.")
+    st.stop()
+
+prefetch_twin(cfg, app_key, dataset_key)
+
+tables = load_tables_progressive(cfg, app_key, dataset_key)
+df = tables["base"]
+split_index = tables.get("split_index")
+
+splits = get_splits(df, index=split_index)
+if not splits:
+    st.error("No se encontraron splits en el dataset.")
+    st.stop()
+
+mode = st.sidebar.radio("Comparar", list(MODE_LABELS), format_func=MODE_LABELS.get, key="split_diff_mode")
+
+if mode == MODE_SAME_FILE:
+    other_df, other_index, other_version = df, split_index, tables.get("version")
+    split_a = st.sidebar.selectbox("Split actual (A)", splits, index=min(1, len(splits) - 1), key="split_diff_split_a")
+    split_b = st.sidebar.selectbox("Split nuevo (B)", splits, index=0, key="split_diff_split_b")
+    caption = f"Split {split_a} -> split {split_b} en el archivo activo."
+else:
+    twin = twin_dataset(cfg, app_key, dataset_key)
+    if twin is None:
+        st.warning("El archivo activo no tiene un archivo equivalente de la otra temporada en apps.yml.")
+        st.stop()
+    other = load_tables_progressive(cfg, *twin)
+    other_df, other_index, other_version = other["base"], other.get("split_index"), other.get("version")
+    common = [s for s in splits if s in set(get_splits(other_df, index=other_index))]
+    if not common:
+        st.warning("Los dos archivos no tienen splits en comun.")
+        st.stop()
+    split_a = split_b = st.sidebar.selectbox("Split", common, key="split_diff_split_common")
+    twin_label = dataset_config(cfg, *twin).label
+    caption = f"Split {split_a}: archivo activo (A) -> {twin_label} (B)."
+
+sidebar_season_switcher()
+sidebar_warmup_status(cfg)
+sidebar_dataset_changes(app_key, dataset_key)
+
+diff = diff_splits(df, split_a, other_df, split_b, index_a=split_index, index_b=other_index)
+st.caption(caption)
+
+counts = diff["Cambio"].value_counts()
+cols = st.columns(4)
+for col, label in zip(cols, ["cambia de estacion", "solo en B", "solo en A", "sin cambio"]):
+    with col:
+        st.metric(label.capitalize(), int(counts.get(label, 0)))
+
+only_changes = st.checkbox("Mostrar solo sitios que cambian", value=True, key="split_diff_only_changes")
+table = diff[diff["Cambio"] != "sin cambio"] if only_changes else diff
+
+st.subheader("Reasignacion de sitios")
+st.dataframe(
+    table,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Site": st.column_config.TextColumn("Site", width="large"),
+        "ID": st.column_config.NumberColumn("ID", width="small"),
+    },
+)
+download_button_df(
+    table,
+    f"cambio_split_{split_a}_a_{split_b}.csv",
+    key=(tables.get("version"), other_version, split_a, split_b, only_changes),
+)
+
+st.subheader("Resumen por estacion")
+st.dataframe(diff_station_summary(diff), use_container_width=False, hide_index=True)
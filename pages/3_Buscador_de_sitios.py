@@ -1,15 +1,14 @@
 import streamlit as st
 import re
 from src.config import load_apps_config
-from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, download_button_df
-from src.data.excel_loader import load_dataset_tables
-from src.logic.site_search import suggest_sites, search_site_exact, enrich_with_important_info
-from src.logic.split_view import get_splits, get_stations_for_split
+from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, sidebar_warmup_status, sidebar_dataset_changes, download_button_df, rerun_started, record_rerun, sidebar_rerun_debug, load_tables_progressive
 
 SHARED_SPLIT_KEY = "shared_selected_split"
 SHARED_STATION_KEY = "shared_selected_station"
 SPLIT_WIDGET_KEY = "search_selected_split"
 STATION_WIDGET_KEY = "search_selected_station"
+QUERY_WIDGET_KEY = "site_search_query"
+HA_WIDGET_KEY = "site_search_show_ha"
 
 def _site_alert_style(value) -> str:
     s = str(value or "").upper()
@@ -17,6 +16,162 @@ def _site_alert_style(value) -> str:
         return "color: #c1121f; font-weight: 700;"
     return ""
 
+def _loading_note(cfg: dict):
+    # La busqueda en todos los archivos usa solo los que ya estan en memoria; no espera a la precarga.
+    loading = loading_datasets(cfg)
+    if loading:
+        st.caption(f"Todavia cargando (no se incluyen en la busqueda en todos los archivos): {', '.join(loading)}.")
+
+def _show_global_placements(cfg: dict, site_name: str, expanded: bool = False):
+    # Todas las ubicaciones del sitio en todos los archivos configurados (OMNIA/Luxriot, temporadas, dias).
+    placements = find_site_everywhere(cfg, site_name)
+    _loading_note(cfg)
+    if placements.empty:
+        return
+    cols = [c for c in ["App", "Archivo", "Split", "Station", "Hour"] if c in placements.columns]
+    with st.expander(f"Donde aparece '{site_name}' en todos los archivos ({len(placements)})", expanded=expanded):
+        st.dataframe(placements[cols], use_container_width=True, hide_index=True)
+
+def _ha_model(cfg: dict, app_key: str, dataset_key: str) -> dict | None:
+    # La hoja H.A. se lee recien cuando algo la va a mostrar (despues queda en memoria para esta
+    # version del Excel). Si falta o no se puede leer, la busqueda sigue sin ella.
+    try:
+        with st.spinner("Cargando hoja H.A..."):
+            return load_ha_model(cfg, app_key, dataset_key)
+    except Exception as e:
+        st.info(f"No se pudo leer la hoja H.A. de este archivo: {e}")
+        return None
+
+def _show_ha_placements(cfg: dict, app_key: str, dataset_key: str, site_name: str):
+    # Reparto High Alert del archivo activo, solo si el usuario lo pide.
+    if not st.checkbox("Ver reparto H.A.", key=HA_WIDGET_KEY):
+        return
+    ha = _ha_model(cfg, app_key, dataset_key)
+    if ha is None:
+        return
+    placements = ha_placements(ha, site_name)
+    if placements.empty:
+        st.caption(f"'{site_name}' no esta en el reparto H.A.")
+        return
+    st.caption(f"'{site_name}' en el reparto H.A. ({len(placements)}):")
+    st.dataframe(placements, use_container_width=False, hide_index=True)
+
+def _search_body(cfg: dict, app_key: str, dataset_key: str, selected_split: int, selected_station: int):
+    tables = load_tables_progressive(cfg, app_key, dataset_key)
+    df = tables["base"]
+    important = tables.get("important_info")
+    site_index = tables.get("site_index")
+
+    query = st.text_input("Buscar sitio (texto parcial o exacto)", key=QUERY_WIDGET_KEY).strip()
+
+    if not query:
+        st.info("Escribe un texto para buscar. Ej: 'Audi', 'Atwell', '(AS)', etc.")
+        return
+
+    # Una coincidencia literal en otro split gana sobre coincidencias aproximadas en el split actual.
+    site_options, fallback = rank_sites_in_split(query, site_index, selected_split, limit=200)
+
+    if not site_options:
+        # Sin coincidencias en Flat Base: se busca tambien en el reparto H.A.
+        ha = _ha_model(cfg, app_key, dataset_key)
+        ha_sites = suggest_ha_sites(ha, query) if ha is not None else []
+        if ha_sites:
+            st.info(f"'{query}' no esta en Flat Base, pero si en el reparto H.A. del archivo seleccionado.")
+            ha_site = st.selectbox("Coincidencias en H.A.", ha_sites, index=0)
+            placements = ha_placements(ha, ha_site)
+            st.caption(f"'{ha_site}' en el reparto H.A. ({len(placements)}):")
+            st.dataframe(placements, use_container_width=False, hide_index=True)
+            return
+        st.warning(f"No se encontraron coincidencias para '{query}' en el archivo seleccionado.")
+        other_sites = suggest_sites_everywhere(cfg, query, limit=50)
+        if other_sites:
+            other_site = st.selectbox("Coincidencias en otros archivos", other_sites, index=0)
+            _show_global_placements(cfg, other_site, expanded=True)
+        else:
+            _loading_note(cfg)
+        return
+
+    if fallback is not None:
+        kind = "literales " if fallback == "fuzzy" else ""
+        st.info(
+            f"No hubo coincidencias {kind}para '{query}' en el split {selected_split}. "
+            "Se muestran coincidencias del resto del archivo."
+        )
+
+    if query.lower() not in site_options[0].lower():
+        st.caption(f"No hay coincidencias literales para '{query}'. Se muestran sitios con nombre parecido.")
+
+    selected_site = st.selectbox(
+        "Coincidencias de sitio (elige una)",
+        site_options,
+        index=0,
+    )
+
+    matches = search_site_exact(df, site_name=selected_site, limit=1, index=site_index, split=selected_split)
+    if matches.empty:
+        st.warning(
+            f"El sitio '{selected_site}' existe en el archivo, "
+            f"pero no aparece en el split {selected_split}."
+        )
+        alt = search_site_exact(df, site_name=selected_site, limit=500, index=site_index)
+        if not alt.empty and {"Split", "Station"}.issubset(set(alt.columns)):
+            where = (
+                alt[["Split", "Station"]]
+                .dropna()
+                .drop_duplicates()
+                .sort_values(["Split", "Station"])
+                .reset_index(drop=True)
+            )
+            st.caption("El sitio si aparece en:")
+            st.dataframe(where, use_container_width=False, hide_index=True)
+        _show_ha_placements(cfg, app_key, dataset_key, selected_site)
+        _show_global_placements(cfg, selected_site)
+        return
+
+    if important is not None:
+        matches = enrich_with_important_info(matches, important, lookup=tables.get("important_lookup"))
+
+    found_stations = []
+    if "Station" in matches.columns:
+        found_stations = sorted(
+            {
+                int(v)
+                for v in matches["Station"].dropna().tolist()
+                if str(v) != "<NA>"
+            }
+        )
+
+    if found_stations:
+        stations_txt = ", ".join(str(s) for s in found_stations)
+        st.success(f"Sitio '{selected_site}': en split {selected_split} aparece en estacion(es): {stations_txt}.")
+        if selected_station in found_stations:
+            st.info("Tu estacion actual si monitorea ese sitio en este split.")
+        else:
+            st.warning("Tu estacion actual no monitorea ese sitio en este split.")
+
+    st.title("Resultado de tu busqueda:")
+    result_cols = [c for c in ["Site", "ID", "Split", "Station"] if c in matches.columns]
+    result_df = matches[result_cols]
+    styled = result_df.style
+    if "Site" in result_df.columns:
+        styled = styled.map(_site_alert_style, subset=["Site"])
+    st.dataframe(styled, use_container_width=True, hide_index=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", selected_site).strip("_").lower()
+    download_button_df(result_df, f"busqueda_{slug}.csv", key=(tables.get("version"), selected_site, selected_split))
+
+    _show_ha_placements(cfg, app_key, dataset_key, selected_site)
+    _show_global_placements(cfg, selected_site)
+
+@st.fragment
+def _search_results(cfg: dict, app_key: str, dataset_key: str, selected_split: int, selected_station: int):
+    # Escribir en el buscador o elegir una coincidencia solo re-ejecuta este bloque, no la pagina.
+    started = rerun_started()
+    try:
+        _search_body(cfg, app_key, dataset_key, selected_split, selected_station)
+    finally:
+        record_rerun("busqueda", started)
+
+page_started = rerun_started()
 st.set_page_config(page_title="Buscador de sitios", layout="wide")
 inject_base_css()
 
@@ -25,6 +180,20 @@ sidebar_app_dataset_picker(cfg)
 
 st.title("Buscador de sitios")
 
+# Lo pesado (pandas, loader, hilos de precarga) se importa despues de pintar titulo y selector.
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, prefetch_twin
+from src.data.watcher import start_watcher
+from src.logic.site_search import rank_sites_in_split, search_site_exact, enrich_with_important_info
+from src.logic.split_view import get_splits, get_stations_for_split
+from src.logic.global_search import find_site_everywhere, loading_datasets, suggest_sites_everywhere
+from src.data.excel_loader import load_ha_model
+from src.logic.ha import ha_placements, suggest_ha_sites
+
+enable_copy_on_write()
+start_warmup(cfg)
+start_watcher(cfg)
+
 app_key = st.session_state.get("app_key")
 dataset_key = st.session_state.get("dataset_key")
 
@@ -32,11 +201,13 @@ if not app_key or not dataset_key:
     st.warning("Selecciona un archivo Excel para continuar.")
     st.stop()
 
-tables = load_dataset_tables(cfg, app_key, dataset_key)
+prefetch_twin(cfg, app_key, dataset_key)
+
+tables = load_tables_progressive(cfg, app_key, dataset_key)
 df = tables["base"]
-important = tables.get("important_info")
+split_index = tables.get("split_index")
 
-splits = get_splits(df)
+splits = get_splits(df, index=split_index)
 if not splits:
     st.error("No se encontraron splits en el dataset seleccionado.")
     st.stop()
@@ -70,89 +241,14 @@ selected_station = st.sidebar.selectbox(
 )
 st.session_state[SHARED_STATION_KEY] = selected_station
 sidebar_season_switcher()
+sidebar_warmup_status(cfg)
+sidebar_dataset_changes(app_key, dataset_key)
 
 st.caption(
     f"Contexto actual: split {selected_split}, tu estacion {selected_station}. "
     "Escribe parte del nombre (ej: West) y selecciona el sitio exacto."
 )
 
-query = st.text_input("Buscar sitio (texto parcial o exacto)", value="").strip()
-
-if not query:
-    st.info("Escribe un texto para buscar. Ej: 'Audi', 'Atwell', '(AS)', etc.")
-    st.stop()
-
-search_df = df
-if "Split" in search_df.columns:
-    search_df = search_df[search_df["Split"] == selected_split]
-
-site_options = suggest_sites(search_df, query=query, limit=200)
-using_fallback = False
-if not site_options:
-    site_options = suggest_sites(df, query=query, limit=200)
-    using_fallback = True
-
-if not site_options:
-    st.warning(f"No se encontraron coincidencias para '{query}' en el archivo seleccionado.")
-    st.stop()
-
-if using_fallback:
-    st.info(
-        f"No hubo coincidencias para '{query}' en el split {selected_split}. "
-        "Se muestran coincidencias del resto del archivo."
-    )
-
-selected_site = st.selectbox(
-    "Coincidencias de sitio (elige una)",
-    site_options,
-    index=0,
-)
-
-matches = search_site_exact(search_df, site_name=selected_site, limit=1)
-if matches.empty:
-    st.warning(
-        f"El sitio '{selected_site}' existe en el archivo, "
-        f"pero no aparece en el split {selected_split}."
-    )
-    alt = search_site_exact(df, site_name=selected_site, limit=500)
-    if not alt.empty and {"Split", "Station"}.issubset(set(alt.columns)):
-        where = (
-            alt[["Split", "Station"]]
-            .dropna()
-            .drop_duplicates()
-            .sort_values(["Split", "Station"])
-            .reset_index(drop=True)
-        )
-        st.caption("El sitio si aparece en:")
-        st.dataframe(where, use_container_width=False, hide_index=True)
-    st.stop()
-
-if important is not None:
-    matches = enrich_with_important_info(matches, important)
-
-found_stations = []
-if "Station" in matches.columns:
-    found_stations = sorted(
-        {
-            int(v)
-            for v in matches["Station"].dropna().tolist()
-            if str(v) != "<NA>"
-        }
-    )
-
-if found_stations:
-    stations_txt = ", ".join(str(s) for s in found_stations)
-    st.success(f"Sitio '{selected_site}': en split {selected_split} aparece en estacion(es): {stations_txt}.")
-    if selected_station in found_stations:
-        st.info("Tu estacion actual si monitorea ese sitio en este split.")
-    else:
-        st.warning("Tu estacion actual no monitorea ese sitio en este split.")
-
-st.title("Resultado de tu busqueda:")
-result_cols = [c for c in ["Site", "ID", "Split", "Station"] if c in matches.columns]
-result_df = matches[result_cols].copy()
-styled = result_df.style
-if "Site" in result_df.columns:
-    styled = styled.map(_site_alert_style, subset=["Site"])
-st.dataframe(styled, use_container_width=True, hide_index=True)
-
+_search_results(cfg, app_key, dataset_key, selected_split, selected_station)
+record_rerun("pagina", page_started)
+sidebar_rerun_debug()
@@ -0,0 +1,84 @@
+import streamlit as st
+from src.config import load_apps_config
+from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, sidebar_warmup_status, sidebar_dataset_changes, load_tables_progressive
+
+st.set_page_config(page_title="Carga por estacion", layout="wide")
+inject_base_css()
+
+cfg = load_apps_config()
+sidebar_app_dataset_picker(cfg)
+
+st.title("Carga por estacion")
+
+# Lo pesado (pandas, loader, hilos de precarga) se importa despues de pintar titulo y selector.
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, prefetch_twin
+from src.data.watcher import start_watcher
+from src.logic.split_view import get_splits
+from src.logic.workload import METRIC_COLS, station_load, hourly_density, imbalance_summary
+
+enable_copy_on_write()
+start_warmup(cfg)
+start_watcher(cfg)
+
+app_key = st.session_state.get("app_key")
+dataset_key = st.session_state.get("dataset_key")
+
+if not app_key or not dataset_key:
+    st.warning("Selecciona un archivo Excel para continuar.")
+    st.stop()
+
+prefetch_twin(cfg, app_key, dataset_key)
+
+tables = load_tables_progressive(cfg, app_key, dataset_key)
+df = tables["base"]
+split_index = tables.get("split_index")
+# Los agregados se calculan al cargar el dataset; aqui solo se leen cortes del cubo.
+cube = tables["workload"]
+
+splits = get_splits(df, index=split_index)
+if not splits:
+    st.error("No se encontraron splits en el dataset.")
+    st.stop()
+
+split = st.sidebar.selectbox("Split", splits, key="workload_split")
+metric = st.sidebar.selectbox("Metrica", METRIC_COLS, key="workload_metric")
+
+sidebar_season_switcher()
+sidebar_warmup_status(cfg)
+sidebar_dataset_changes(app_key, dataset_key)
+
+load = station_load(cube, split, metric)
+summary = imbalance_summary(load, metric)
+
+cols = st.columns(4)
+with cols[0]:
+    st.metric(f"Max {metric}", summary["max"])
+with cols[1]:
+    st.metric(f"Min {metric}", summary["min"])
+with cols[2]:
+    st.metric("Promedio", summary["mean"])
+with cols[3]:
+    st.metric("Desbalance (CV %)", summary["cv"])
+
+st.subheader("Totales por estacion")
+st.bar_chart(load.set_index("Station")[[metric]])
+st.dataframe(
+    load,
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        "Station": st.column_config.NumberColumn("Station", width="small"),
+        "Sitios": st.column_config.ProgressColumn(
+            "Sitios", format="%d", min_value=0, max_value=max(int(load["Sitios"].max()), 1)
+        ),
+        "Desvio %": st.column_config.NumberColumn("Desvio %", format="%.1f %%", help=f"Desvio de {metric} respecto del promedio del split"),
+    },
+)
+
+st.subheader(f"{metric} por hora")
+density = hourly_density(cube, split, metric)
+if density.empty:
+    st.info("El split no tiene horarios.")
+else:
+    st.dataframe(density, use_container_width=True)
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import streamlit as st
+from src.config import load_apps_config
+from src.ui.formatting import inject_base_css, sidebar_app_dataset_picker, sidebar_season_switcher, sidebar_warmup_status, sidebar_dataset_changes, load_tables_progressive
+
+REFRESH_SECONDS = 60
+
+st.set_page_config(page_title="En turno ahora", layout="wide")
+inject_base_css()
+
+cfg = load_apps_config()
+sidebar_app_dataset_picker(cfg)
+
+st.title("En turno ahora")
+
+# Lo pesado (pandas, loader, hilos de precarga) se importa despues de pintar titulo y selector.
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, prefetch_twin
+from src.data.watcher import start_watcher
+from src.logic.split_view import get_splits
+from src.logic.timeline import split_now
+
+enable_copy_on_write()
+start_warmup(cfg)
+start_watcher(cfg)
+
+app_key = st.session_state.get("app_key")
+dataset_key = st.session_state.get("dataset_key")
+
+if not app_key or not dataset_key:
+    st.warning("Selecciona un archivo Excel para continuar.")
+    st.stop()
+
+prefetch_twin(cfg, app_key, dataset_key)
+
+tables = load_tables_progressive(cfg, app_key, dataset_key)
+df = tables["base"]
+split_index = tables.get("split_index")
+
+splits = get_splits(df, index=split_index)
+if not splits:
+    st.error("No se encontraron splits en el dataset.")
+    st.stop()
+
+split = st.sidebar.selectbox("Split", splits, key="now_split")
+station_opt = st.sidebar.selectbox("Station", ["Todas"] + list(range(1, int(split) + 1)), key="now_station")
+live = st.sidebar.toggle("Hora actual", value=True, key="now_live")
+if not live:
+    day = st.sidebar.date_input("Fecha", key="now_day")
+    clock = st.sidebar.time_input("Hora", key="now_clock", step=900)
+
+sidebar_season_switcher()
+sidebar_warmup_status(cfg)
+sidebar_dataset_changes(app_key, dataset_key)
+
+@st.fragment(run_every=REFRESH_SECONDS if live else None)
+def _now_panel() -> None:
+    # Solo este bloque se re-ejecuta cada minuto; cada consulta es una busqueda binaria por station.
+    # Se vuelven a leer las tablas para tomar la version nueva si el Excel cambio entre refrescos.
+    current = load_tables_progressive(cfg, app_key, dataset_key)
+    at = datetime.now() if live else datetime.combine(day, clock)
+    active = split_now(current["base"], current["timeline"], split, at)
+
+    st.caption(f"{at:%A %d/%m %I:%M %p} - split {split}")
+    counts = active["Station"].value_counts() if len(active) else {}
+    cols = st.columns(min(int(split), 8))
+    for i, stn in enumerate(range(1, int(split) + 1)):
+        with cols[i % len(cols)]:
+            st.metric(f"Station {stn}", int(counts.get(stn, 0)))
+
+    table = active if station_opt == "Todas" else active[active["Station"] == station_opt]
+    if table.empty:
+        st.info("No hay sitios activos a esta hora.")
+        return
+    st.dataframe(
+        table,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            "Station": st.column_config.NumberColumn("Station", width="small"),
+            "Time": st.column_config.TextColumn("Time", width="small"),
+            "Site": st.column_config.TextColumn("Site", width="large"),
+            "ID": st.column_config.NumberColumn("ID", width="small"),
+            "Min. restantes": st.column_config.NumberColumn("Min. restantes", format="%d min"),
+        },
+    )
+
+_now_panel()
@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import streamlit as st
+from src.config import load_apps_config
+from src.metrics import export_jsonl, export_prometheus, reset, revision, snapshot
+from src.ui.export import export_button
+from src.ui.formatting import debug_enabled, inject_base_css, sidebar_app_dataset_picker
+
+STAGE_FIELDS = ("stage", "count", "sum", "max", "p50", "p95", "rows")
+
+def _text_file(text: str) -> tuple[bytes, int]:
+    # (bytes, lineas) para export_button.
+    return text.encode("utf-8"), text.count("\n")
+
+st.set_page_config(page_title="Metricas", layout="wide")
+inject_base_css()
+
+cfg = load_apps_config()
+sidebar_app_dataset_picker(cfg)
+
+st.title("Metricas")
+
+snap = snapshot()
+st.caption(
+    f"Metricas del proceso desde {datetime.fromtimestamp(snap['started_at']):%d/%m %H:%M:%S} "
+    "(todas las sesiones, warm-up, watcher y API)."
+)
+
+# Caches: aciertos / fallos sumados sobre todos los archivos.
+caches: dict[str, dict] = {}
+fallbacks = {"ok": 0, "error": 0}
+for c in snap["counters"]:
+    if c["metric"] == "cache_total":
+        row = caches.setdefault(c["cache"], {"Cache": c["cache"], "Aciertos": 0, "Fallos": 0})
+        row["Aciertos" if c["result"] == "hit" else "Fallos"] += int(c["value"])
+    elif c["metric"] == "excel_fallback_total":
+        fallbacks[c["result"]] += int(c["value"])
+for row in caches.values():
+    total = row["Aciertos"] + row["Fallos"]
+    row["% aciertos"] = round(100 * row["Aciertos"] / total, 1) if total else None
+
+left, right = st.columns([2, 1])
+with left:
+    st.subheader("Caches")
+    if caches:
+        st.dataframe(sorted(caches.values(), key=lambda r: r["Cache"]), hide_index=True, use_container_width=True)
+    else:
+        st.info("Todavia no hay lecturas registradas.")
+with right:
+    st.subheader("Excel bloqueado")
+    st.metric("Lecturas via copia temporal", fallbacks["ok"])
+    st.metric("Fallos de lectura", fallbacks["error"])
+
+st.subheader("Etapas")
+stages = [
+    {
+        "Etapa": s["stage"],
+        "Detalle": ", ".join(f"{k}={v}" for k, v in s.items() if k not in STAGE_FIELDS),
+        "N": s["count"],
+        "p50 ms": round(s["p50"] * 1000, 2),
+        "p95 ms": round(s["p95"] * 1000, 2),
+        "max ms": round(s["max"] * 1000, 2),
+        "Total s": round(s["sum"], 3),
+        "Filas": s["rows"],
+    }
+    for s in sorted(snap["stages"], key=lambda s: s["sum"], reverse=True)
+]
+if stages:
+    st.dataframe(stages, hide_index=True, use_container_width=True)
+else:
+    st.info("Todavia no hay etapas medidas.")
+
+st.subheader("Exportar")
+# Los archivos se arman solo al pedirlos, con el registro tal como esta en ese momento.
+rev = revision()
+c_prom, c_jsonl = st.columns([1, 1])
+with c_prom:
+    export_button(
+        "Prometheus (texto)",
+        "msplits_metrics.prom",
+        "text/plain",
+        ("metrics", "prom", rev),
+        lambda: _text_file(export_prometheus()),
+        kind="metrics_prom",
+    )
+with c_jsonl:
+    export_button(
+        "Eventos (JSON lines)",
+        f"msplits_metrics_{datetime.now():%Y%m%d_%H%M}.jsonl",
+        "application/x-ndjson",
+        ("metrics", "jsonl", rev),
+        lambda: _text_file(export_jsonl()),
+        kind="metrics_jsonl",
+    )
+
+# Reiniciar borra las metricas de todas las sesiones: solo en modo depuracion y con confirmacion.
+if debug_enabled():
+    with st.expander("Reiniciar metricas"):
+        confirm = st.checkbox("Entiendo que se borran las metricas de todas las sesiones", key="metrics_reset_confirm")
+        if st.button("Reiniciar metricas", disabled=not confirm):
+            reset()
+            st.session_state.pop("metrics_reset_confirm", None)
+            st.rerun()
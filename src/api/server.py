@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import threading
+from collections import OrderedDict
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs
+from wsgiref.simple_server import WSGIServer, make_server
+from wsgiref.util import setup_testing_defaults
+
+import pandas as pd
+
+from src.config import config_datasets, load_apps_config
+from src.data.excel_loader import load_dataset_tables
+from src.data.store import enable_copy_on_write
+from src.data.warmup import start_warmup, sync_warmup
+from src.data.watcher import start_watcher
+from src.logic.change_split import compare_splits_for_station
+from src.logic.site_search import search_site_exact
+from src.logic.split_view import build_split_view, get_splits
+from src.metrics import cache_result, export_prometheus, timed
+
+# API de solo lectura para wallboards y scripts de cambio de turno. Lee el mismo store en memoria
+# que las paginas (una copia de las tablas por proceso) y no pasa por Streamlit.
+#
+#   GET /api/datasets
+#   GET /api/<app>/<dataset>/splits
+#   GET /api/<app>/<dataset>/splits/<split>/stations/<station>[?extended=1]
+#   GET /api/<app>/<dataset>/sites?name=<site>[&split=<n>]
+#   GET /api/<app>/<dataset>/compare?a=<split>&b=<split>&station=<n>
+#   GET /metrics   (metricas del proceso en formato de texto de Prometheus)
+#
+# ETag = version del Excel: mientras el archivo no cambie la respuesta es la misma.
+API_FORMAT = 1
+MAX_CACHED_RESPONSES = 512
+
+class ApiError(Exception):
+    def __init__(self, status: str, message: str):
+        super().__init__(message)
+        self.status = status
+
+_CACHE: OrderedDict[tuple, bytes] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+def _records(df: pd.DataFrame) -> list[dict]:
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+def _int_param(value: str | None, name: str) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ApiError("400 Bad Request", f"Parametro '{name}' invalido: {value!r}")
+
+def _tables(cfg: dict, app_key: str, dataset_key: str) -> dict:
+    try:
+        return load_dataset_tables(cfg, app_key, dataset_key)
+    except KeyError as e:
+        raise ApiError("404 Not Found", str(e.args[0]) if e.args else str(e))
+    except OSError as e:
+        # Excel ausente o bloqueado por OneDrive/Excel.
+        raise ApiError("503 Service Unavailable", f"No se pudo leer el Excel: {e}")
+
+def _current_config() -> dict:
+    try:
+        cfg = load_apps_config()
+    except (OSError, ValueError) as e:
+        raise ApiError("503 Service Unavailable", f"apps.yml invalido: {e}")
+    sync_warmup(cfg)
+    return cfg
+
+def _datasets(cfg: dict) -> list[dict]:
+    return [
+        {"app": ds.app_key, "dataset": ds.dataset_key, "label": ds.full_label, "season": ds.season}
+        for ds in config_datasets(cfg)
+    ]
+
+def _route(rest: list[str], query: dict[str, str]) -> tuple[str, dict]:
+    # Ruta y parametros validados antes de mirar el ETag: una ruta o parametro invalido nunca responde 304.
+    if rest == ["splits"]:
+        return "splits", {}
+
+    if len(rest) == 4 and rest[0] == "splits" and rest[2] == "stations":
+        return "station", {
+            "split": _int_param(rest[1], "split"),
+            "station": _int_param(rest[3], "station"),
+            "extended": query.get("extended", "0") not in ("", "0", "false"),
+        }
+
+    if rest == ["sites"]:
+        name = query.get("name", "")
+        if not name.strip():
+            raise ApiError("400 Bad Request", "Falta el parametro 'name'.")
+        return "sites", {"name": name, "split": _int_param(query["split"], "split") if "split" in query else None}
+
+    if rest == ["compare"]:
+        return "compare", {
+            "a": _int_param(query.get("a"), "a"),
+            "b": _int_param(query.get("b"), "b"),
+            "station": _int_param(query.get("station"), "station"),
+        }
+
+    raise ApiError("404 Not Found", "Ruta no encontrada.")
+
+def _dataset_payload(tables: dict, route: str, params: dict) -> dict:
+    df = tables["base"]
+    index = tables.get("split_index")
+
+    if route == "splits":
+        return {"splits": get_splits(df, index=index)}
+
+    if route == "station":
+        view = build_split_view(df, params["split"], params["station"], params["extended"], index=index)
+        return {"split": params["split"], "station": params["station"], "rows": _records(view)}
+
+    if route == "sites":
+        matches = search_site_exact(df, params["name"], index=tables.get("site_index"), split=params["split"])
+        return {"name": params["name"], "rows": _records(matches)}
+
+    a, b, station = params["a"], params["b"], params["station"]
+    added, removed = compare_splits_for_station(df, a, b, station, index=index)
+    return {"split_a": a, "split_b": b, "station": station, "added": _records(added), "removed": _records(removed)}
+
+def _respond(start_response, status: str, body: bytes, etag: str | None = None, content_type: str = "application/json; charset=utf-8") -> list[bytes]:
+    headers = [("Content-Type", content_type), ("Content-Length", str(len(body)))]
+    if etag:
+        headers += [("ETag", etag), ("Cache-Control", "no-cache")]
+    start_response(status, headers)
+    return [body]
+
+def _json(payload) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8")
+
+def make_app(cfg: dict | None = None):
+    # Igual que las paginas: las respuestas se arman sobre vistas de las tablas compartidas.
+    # Sin cfg fijo, cada pedido usa el apps.yml vigente (datasets agregados o Excel movidos).
+    enable_copy_on_write()
+
+    def app(environ, start_response):
+        if environ.get("REQUEST_METHOD", "GET") != "GET":
+            return _respond(start_response, "405 Method Not Allowed", _json({"error": "Solo lectura (GET)."}))
+        path = [p for p in environ.get("PATH_INFO", "").split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(environ.get("QUERY_STRING", "")).items()}
+        try:
+            if path == ["metrics"]:
+                body = export_prometheus().encode("utf-8")
+                return _respond(start_response, "200 OK", body, content_type="text/plain; version=0.0.4; charset=utf-8")
+            current = cfg if cfg is not None else _current_config()
+            if path[:1] != ["api"] or len(path) < 2:
+                raise ApiError("404 Not Found", "Ruta no encontrada.")
+            if path[1:] == ["datasets"]:
+                return _respond(start_response, "200 OK", _json({"datasets": _datasets(current)}))
+            if len(path) < 4:
+                raise ApiError("404 Not Found", "Ruta no encontrada.")
+
+            route, params = _route(path[3:], query)
+            tables = _tables(current, path[1], path[2])
+            etag = f'"{API_FORMAT}-{tables.get("version")}"'
+            if etag in environ.get("HTTP_IF_NONE_MATCH", ""):
+                return _respond(start_response, "304 Not Modified", b"", etag)
+
+            # El cuerpo solo depende de (version, ruta, query): se guarda serializado.
+            cache_key = (tables.get("version"), tuple(path), tuple(sorted(query.items())))
+            with _CACHE_LOCK:
+                body = _CACHE.get(cache_key)
+                if body is not None:
+                    _CACHE.move_to_end(cache_key)
+            cache_result("api", body is not None)
+            if body is None:
+                # La etiqueta es la ruta ya validada: una ruta inventada no crea series nuevas.
+                with timed("api", route=route):
+                    body = _json({"app": path[1], "dataset": path[2], "version": tables.get("version"), **_dataset_payload(tables, route, params)})
+                with _CACHE_LOCK:
+                    _CACHE[cache_key] = body
+                    while len(_CACHE) > MAX_CACHED_RESPONSES:
+                        _CACHE.popitem(last=False)
+            return _respond(start_response, "200 OK", body, etag)
+        except ApiError as e:
+            return _respond(start_response, e.status, _json({"error": str(e)}))
+
+    return app
+
+def local_get(app, path: str, headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+    """
+    Llama la app WSGI en el mismo proceso, sin abrir un puerto (para pruebas y scripts).
+    Devuelve (status, headers, cuerpo).
+    """
+    path_info, _, query = path.partition("?")
+    environ: dict = {"PATH_INFO": path_info, "QUERY_STRING": query, "REQUEST_METHOD": "GET"}
+    for k, v in (headers or {}).items():
+        environ["HTTP_" + k.upper().replace("-", "_")] = v
+    setup_testing_defaults(environ)
+    environ["wsgi.input"] = io.BytesIO(b"")
+
+    captured: dict = {}
+
+    def start_response(status, response_headers, exc_info=None):
+        captured["status"] = int(status.split()[0])
+        captured["headers"] = dict(response_headers)
+
+    body = b"".join(app(environ, start_response))
+    return captured["status"], captured["headers"], body
+
+class _ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API JSON de solo lectura sobre los Excel de apps.yml")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8601)
+    args = parser.parse_args()
+
+    cfg = load_apps_config()
+    # Igual que las paginas: precarga en segundo plano y recarga cuando cambia un Excel.
+    start_warmup(cfg)
+    start_watcher(cfg)
+    with make_server(args.host, args.port, make_app(), server_class=_ThreadingWSGIServer) as httpd:
+        print(f"API en http://{args.host}:{args.port}/api/datasets")
+        httpd.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,218 @@
 from __future__ import annotations
+import html
+import os
+import re
+import threading
+import zipfile
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
 import yaml
 
+SEASONS = ("nov_mar", "mar_nov")
+
 def project_root() -> Path:
     # .../Monitoring-splits/src/config.py -> parents[1] = Monitoring-splits
     return Path(__file__).resolve().parents[1]
 
-def load_apps_config(path: str = "config/apps.yml") -> dict:
+@dataclass(frozen=True)
+class DatasetConfig:
+    app_key: str
+    dataset_key: str
+    app_label: str
+    label: str
+    file: str
+    file_abs: str
+    base_sheet: str
+    ha_sheet: str
+    ha_header_row: int
+    important_info_sheet: str | None
+    season: str | None
+
+    @property
+    def id(self) -> str:
+        return f"{self.app_key}::{self.dataset_key}"
+
+    @property
+    def full_label(self) -> str:
+        return f"{self.app_label} - {self.label}"
+
+@dataclass(frozen=True)
+class AppsConfig:
+    """
+    apps.yml ya validado:
+      raw:      el YAML como mapping de solo lectura (lo que devuelve load_apps_config)
+      datasets: un DatasetConfig por (app, dataset), en el orden del archivo
+      problems: avisos que no impiden arrancar (Excel inexistente, hoja que no esta, app vacia)
+    """
+    raw: MappingProxyType
+    datasets: tuple[DatasetConfig, ...]
+    problems: tuple[str, ...]
+
+    def dataset(self, app_key: str, dataset_key: str) -> DatasetConfig:
+        for ds in self.datasets:
+            if ds.app_key == app_key and ds.dataset_key == dataset_key:
+                return ds
+        if app_key not in self.raw.get("apps", {}):
+            raise KeyError(f"App '{app_key}' no existe en config.")
+        raise KeyError(f"Dataset '{dataset_key}' no existe para app '{app_key}'.")
+
+def infer_season(dataset_key: str, dataset_cfg: Mapping) -> str | None:
+    text = " ".join(
+        [
+            str(dataset_key or ""),
+            str(dataset_cfg.get("label", "")),
+            str(dataset_cfg.get("file", "")),
+        ]
+    ).lower()
+    text = text.replace("–", "-").replace("—", "-")
+
+    if re.search(r"\bnov\s*(?:->|to|-|a)?\s*mar\b", text):
+        return "nov_mar"
+    if re.search(r"\bmar\s*(?:->|to|-|a)?\s*nov\b", text):
+        return "mar_nov"
+    if "nov_mar" in text:
+        return "nov_mar"
+    if "mar_nov" in text:
+        return "mar_nov"
+    return None
+
+def _sheet_names(file_abs: str) -> list[str] | None:
+    # Nombres de hojas desde xl/workbook.xml, sin cargar el libro (milisegundos por archivo).
+    try:
+        with zipfile.ZipFile(file_abs) as z:
+            xml = z.read("xl/workbook.xml").decode("utf-8")
+    except (OSError, KeyError, zipfile.BadZipFile):
+        return None
+    return [html.unescape(n) for n in re.findall(r'<sheet\b[^>]*\bname="([^"]*)"', xml)]
+
+def _freeze(value):
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def parse_apps_config(data, source: str = "apps.yml") -> AppsConfig:
+    # Errores de esquema -> ValueError (la app no puede arrancar); problemas de archivos -> avisos.
+    if not isinstance(data, Mapping) or not isinstance(data.get("apps"), Mapping):
+        raise ValueError(f"{source}: falta la seccion 'apps'.")
+
+    errors: list[str] = []
+    problems: list[str] = []
+    datasets: list[DatasetConfig] = []
+    root = project_root()
+    for a_key, a_cfg in data["apps"].items():
+        if not isinstance(a_cfg, Mapping):
+            errors.append(f"app '{a_key}': se esperaba un mapping.")
+            continue
+        a_datasets = a_cfg.get("datasets") or {}
+        if not isinstance(a_datasets, Mapping):
+            errors.append(f"app '{a_key}': 'datasets' debe ser un mapping.")
+            continue
+        if not a_datasets:
+            problems.append(f"La app '{a_key}' no tiene archivos configurados.")
+        for d_key, d_cfg in a_datasets.items():
+            where = f"{a_key}.{d_key}"
+            if not isinstance(d_cfg, Mapping) or not d_cfg.get("file"):
+                errors.append(f"{where}: falta 'file'.")
+                continue
+            try:
+                ha_header_row = int(d_cfg.get("ha_header_row", 1))
+            except (TypeError, ValueError):
+                errors.append(f"{where}: 'ha_header_row' debe ser un numero.")
+                continue
+            season = d_cfg.get("season") or infer_season(d_key, d_cfg)
+            if season not in SEASONS + (None,):
+                errors.append(f"{where}: 'season' debe ser uno de {', '.join(SEASONS)}.")
+                continue
+
+            ds = DatasetConfig(
+                app_key=a_key,
+                dataset_key=d_key,
+                app_label=str(a_cfg.get("label", a_key)),
+                label=str(d_cfg.get("label", d_key)),
+                file=str(d_cfg["file"]),
+                file_abs=str(root / d_cfg["file"]),
+                base_sheet=str(d_cfg.get("base_sheet", "Flat Base")),
+                ha_sheet=str(d_cfg.get("ha_sheet", " (H.A.) Flat Base")),
+                ha_header_row=ha_header_row,
+                important_info_sheet=d_cfg.get("important_info_sheet"),
+                season=season,
+            )
+            datasets.append(ds)
+
+            if not Path(ds.file_abs).exists():
+                problems.append(f"{where}: no existe el Excel {ds.file}.")
+                continue
+            sheets = _sheet_names(ds.file_abs)
+            if sheets is None:
+                problems.append(f"{where}: no se pudo leer la lista de hojas de {ds.file}.")
+                continue
+            for sheet in (ds.base_sheet, ds.ha_sheet, ds.important_info_sheet):
+                if sheet and sheet not in sheets:
+                    problems.append(f"{where}: la hoja '{sheet}' no existe en {ds.file}.")
+
+    if errors:
+        raise ValueError(f"{source} invalido:\n- " + "\n- ".join(errors))
+    return AppsConfig(raw=_freeze(data), datasets=tuple(datasets), problems=tuple(problems))
+
+# Un parse por archivo y por version: se vuelve a leer solo si cambia el mtime/tamano de apps.yml.
+_CACHE: dict[Path, tuple[tuple[int, int], AppsConfig]] = {}
+_CACHE_LOCK = threading.Lock()
+# cfg que no vienen del cache (dicts armados a mano o una version anterior de apps.yml).
+_OTHERS: dict[int, tuple[Mapping, AppsConfig]] = {}
+_MAX_OTHERS = 8
+
+def apps_config(path: str = "config/apps.yml") -> AppsConfig:
     cfg_path = project_root() / path
-    if not cfg_path.exists():
+    try:
+        st_ = os.stat(cfg_path)
+    except FileNotFoundError:
         raise FileNotFoundError(f"No existe {cfg_path}")
-    with cfg_path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
-
-def resolve_dataset(cfg: dict, app_key: str, dataset_key: str) -> dict:
-    apps = cfg.get("apps", {})
-    if app_key not in apps:
-        raise KeyError(f"App '{app_key}' no existe en config.")
-    datasets = apps[app_key].get("datasets", {})
-    if dataset_key not in datasets:
-        raise KeyError(f"Dataset '{dataset_key}' no existe para app '{app_key}'.")
-    ds = datasets[dataset_key].copy()
-    # Resolver file path a absoluto
-    ds["file_abs"] = str(project_root() / ds["file"])
-    return ds
+    stamp = (st_.st_mtime_ns, st_.st_size)
+
+    hit = _CACHE.get(cfg_path)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    with _CACHE_LOCK:
+        hit = _CACHE.get(cfg_path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        with cfg_path.open("r", encoding="utf-8") as f:
+            parsed = parse_apps_config(yaml.safe_load(f), source=str(cfg_path))
+        _CACHE[cfg_path] = (stamp, parsed)
+    return parsed
+
+def load_apps_config(path: str = "config/apps.yml") -> Mapping:
+    # Mapping de solo lectura compartido por todas las sesiones (mismo objeto mientras apps.yml no cambie).
+    return apps_config(path).raw
+
+def _parsed(cfg: Mapping) -> AppsConfig:
+    # Los cfg que salen de load_apps_config reutilizan su parse; cualquier otro se valida una vez.
+    for _, parsed in list(_CACHE.values()):
+        if parsed.raw is cfg:
+            return parsed
+    hit = _OTHERS.get(id(cfg))
+    if hit is not None and hit[0] is cfg:
+        return hit[1]
+    parsed = parse_apps_config(cfg)
+    with _CACHE_LOCK:
+        _OTHERS[id(cfg)] = (cfg, parsed)
+        while len(_OTHERS) > _MAX_OTHERS:
+            del _OTHERS[next(iter(_OTHERS))]
+    return parsed
+
+def config_datasets(cfg: Mapping) -> tuple[DatasetConfig, ...]:
+    return _parsed(cfg).datasets
+
+def config_problems(cfg: Mapping) -> tuple[str, ...]:
+    return _parsed(cfg).problems
+
+def dataset_config(cfg: Mapping, app_key: str, dataset_key: str) -> DatasetConfig:
+    return _parsed(cfg).dataset(app_key, dataset_key)
+
+def resolve_dataset(cfg: Mapping, app_key: str, dataset_key: str) -> dict:
+    ds = dataset_config(cfg, app_key, dataset_key)
+    return {**cfg["apps"][app_key]["datasets"][dataset_key], "file_abs": ds.file_abs}
@@ -1,40 +1,97 @@
 from __future__ import annotations
 
 from pathlib import Path
+import json
 import shutil
 import tempfile
+import threading
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+from src.data.snapshot import content_hash, file_stat, load_snapshot, save_snapshot
+from src.data.store import get_entry, key_lock, put_entry, tables_memory
+from src.metrics import cache_result, inc, timed
+
 BASE_COLS = [
     "Key","Split","Station","Hour","Time","Site","Drop time","SIG Tools","Map",
     "SUNDAY (D.T.)","Notes*","Gates","Entrances","LPR","PTZ","Important Cameras","ID"
 ]
 HA_COLS = ["Split","Station","Hour","Time","Site","Drop time","SUNDAY (D.T.)","Notes*"]
 
-def _normalize_types(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c).strip() for c in df.columns]
+# Las tablas cargadas viven en src.data.store: una sola copia por (archivo, hojas),
+# compartida por todas las sesiones y por el warm-up. Se invalida cuando cambia mtime/size.
+_AUTO_REVALIDATE = True
+
+# Textos que el Excel/pandas usan para "vacio" y que se guardan como nulo.
+_NULL_TEXT = ["nan", "None", "NaT"]
+# Columnas de texto con hasta este ratio de valores distintos por fila se guardan como category.
+CATEGORY_MAX_RATIO = 0.5
+# Marca por hilo: _read_workbook la prende solo cuando st.cache_data NO tenia la lectura.
+_PARSE_FLAG = threading.local()
+
+def _normalize_text(s: pd.Series) -> pd.Series:
+    # strip + textos nulos ("nan"/"None"/"NaT") se resuelven sobre los valores UNICOS de la columna
+    # (factorize) y no fila por fila: no se crean arreglos temporales de strings del tamano de la tabla.
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    cleaned = pd.Index(uniques, dtype=object).astype(str).str.strip()
+    cleaned = cleaned.where(~cleaned.isin(_NULL_TEXT), None)
+    # Dos valores distintos pueden quedar iguales tras el strip: se vuelven a factorizar.
+    clean_codes, categories = pd.factorize(cleaned, use_na_sentinel=True)
+    final_codes = np.full(len(codes), -1, dtype=np.intp)
+    valid = codes >= 0
+    final_codes[valid] = clean_codes[codes[valid]]
 
-    for c in ["Split", "Station"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+    if len(s) and len(categories) <= CATEGORY_MAX_RATIO * len(s):
+        # Pocos valores distintos (Site, Hour, Time, Drop time, Notes*...): category guarda cada texto una vez.
+        return pd.Series(pd.Categorical.from_codes(final_codes, categories=categories), index=s.index, name=s.name)
+    values = np.full(len(s), None, dtype=object)
+    has_value = final_codes >= 0
+    values[has_value] = np.asarray(categories, dtype=object)[final_codes[has_value]]
+    return pd.Series(values, index=s.index, name=s.name, dtype=object)
 
-    if "ID" in df.columns:
-        df["ID"] = pd.to_numeric(df["ID"], errors="coerce").astype("Int64")
+def _normalize_types(df: pd.DataFrame) -> pd.DataFrame:
+    # Arma un frame nuevo columna a columna (sin df.copy() previo).
+    out = {}
+    for raw_name in df.columns:
+        c = str(raw_name).strip()
+        s = df[raw_name]
+        if c in ("Split", "Station", "ID"):
+            out[c] = pd.to_numeric(s, errors="coerce").astype("Int64")
+        elif s.dtype == "object":
+            out[c] = _normalize_text(s)
+        else:
+            out[c] = s
+    return pd.DataFrame(out, index=df.index)
 
-    for c in df.columns:
-        if df[c].dtype == "object":
-            df[c] = df[c].astype(str).str.strip()
-            df[c] = df[c].replace({"nan": None, "None": None, "NaT": None})
+def _usecols(cols: tuple[str, ...] | None):
+    # Filtra columnas al parsear: no se materializan columnas que luego se descartan.
+    if cols is None:
+        return None
+    wanted = set(cols)
+    return lambda c: c in wanted
 
-    return df
+def _parse_workbook(path, sheets: tuple) -> dict:
+    # Abre el libro UNA sola vez (openpyxl en modo read_only) y parsea todas las hojas pedidas.
+    out = {}
+    with pd.ExcelFile(path, engine="openpyxl") as book:
+        for sheet_name, header, cols, optional in sheets:
+            try:
+                out[sheet_name] = book.parse(sheet_name=sheet_name, header=header, usecols=_usecols(cols))
+            except Exception:
+                if not optional:
+                    raise
+                out[sheet_name] = None
+    return out
 
 @st.cache_data(show_spinner=False)
-def _read_excel(file_abs: str, sheet_name: str, header: int):
+def _read_workbook(file_abs: str, sheets: tuple, file_version: str = "") -> dict:
+    # sheets: ((sheet_name, header, cols | None, optional), ...)
     # header=0 para hojas normales, header=1 para HA
+    # file_version solo forma parte de la llave de cache: evita devolver una lectura vieja si el Excel cambio.
+    _PARSE_FLAG.parsed = True
     try:
-        return pd.read_excel(file_abs, sheet_name=sheet_name, header=header)
+        return _parse_workbook(file_abs, sheets)
     except PermissionError as direct_err:
         src = Path(file_abs)
         # Fallback: copiar primero el archivo y leer desde copia temporal.
@@ -44,10 +101,13 @@ def _read_excel(file_abs: str, sheet_name: str, header: int):
                 tmp_path = Path(tmp.name)
             shutil.copy2(src, tmp_path)
             try:
-                return pd.read_excel(tmp_path, sheet_name=sheet_name, header=header)
+                raw = _parse_workbook(tmp_path, sheets)
             finally:
                 tmp_path.unlink(missing_ok=True)
+            inc("excel_fallback_total", result="ok", file=src.name)
+            return raw
         except Exception as fallback_err:
+            inc("excel_fallback_total", result="error", file=src.name)
             raise PermissionError(
                 f"No se pudo abrir el Excel '{file_abs}'. "
                 "Cierra el archivo en Excel, espera que OneDrive termine de sincronizar "
@@ -56,37 +116,213 @@ def _read_excel(file_abs: str, sheet_name: str, header: int):
                 f"Detalle fallback: {fallback_err}"
             ) from fallback_err
 
-def load_dataset_tables(cfg: dict, app_key: str, dataset_key: str) -> dict:
-    from src.config import resolve_dataset
+def set_auto_revalidate(enabled: bool) -> None:
+    # Con el watcher activo, las sesiones NO recargan por su cuenta al ver otro mtime:
+    # siguen leyendo la version en memoria hasta que el watcher publique la nueva completa.
+    global _AUTO_REVALIDATE
+    _AUTO_REVALIDATE = enabled
+
+def _dataset_spec(cfg: dict, app_key: str, dataset_key: str, must_exist: bool = True) -> tuple[str, dict, str]:
+    # must_exist=False solo arma la llave del store: para consultas (cargado?, memoria) que no deben
+    # fallar si el Excel configurado no existe; ese caso ya lo reporta la validacion de config.
+    from src.config import dataset_config
 
-    ds = resolve_dataset(cfg, app_key, dataset_key)
-    file_abs = ds["file_abs"]
+    ds = dataset_config(cfg, app_key, dataset_key)
+    file_abs = ds.file_abs
 
-    if not Path(file_abs).exists():
+    if must_exist and not Path(file_abs).exists():
         raise FileNotFoundError(f"No existe el Excel: {file_abs}")
 
-    base_sheet = ds.get("base_sheet", "Flat Base")
-    ha_sheet = ds.get("ha_sheet", " (H.A.) Flat Base")
-    ha_header_row = int(ds.get("ha_header_row", 1))
-    important_sheet = ds.get("important_info_sheet")
+    spec = {
+        "base_sheet": ds.base_sheet,
+        "ha_sheet": ds.ha_sheet,
+        "ha_header_row": ds.ha_header_row,
+        "important_info_sheet": ds.important_info_sheet,
+    }
+    key = f"{file_abs}|{json.dumps(spec, sort_keys=True)}"
+    return file_abs, spec, key
+
+def load_dataset_tables(cfg: dict, app_key: str, dataset_key: str) -> dict:
+    file_abs, spec, key = _dataset_spec(cfg, app_key, dataset_key)
+
+    hit = get_entry(key)
+    if hit is not None and not _AUTO_REVALIDATE:
+        cache_result("store", True)
+        return hit[1]
+    stat = file_stat(file_abs)
+    if hit is not None and hit[0] == stat:
+        cache_result("store", True)
+        return hit[1]
+
+    # Un lock por archivo: si el warm-up y una sesion piden el mismo Excel, se parsea una sola vez.
+    with key_lock(key):
+        hit = get_entry(key)
+        if hit is not None and hit[0] == stat:
+            cache_result("store", True)
+            return hit[1]
+        cache_result("store", False)
+        with timed("load", file=Path(file_abs).name) as m:
+            tables = _load_tables(file_abs, spec)
+            m["rows"] = len(tables["base"])
+        put_entry(key, stat, tables)
+    return tables
+
+def reload_dataset_tables(cfg: dict, app_key: str, dataset_key: str) -> tuple[dict | None, dict]:
+    # Carga la version actual del Excel y la publica de una sola vez (swap atomico de la entrada).
+    # Devuelve (tablas_anteriores, tablas_nuevas).
+    file_abs, spec, key = _dataset_spec(cfg, app_key, dataset_key)
+    with key_lock(key):
+        old = get_entry(key)
+        stat = file_stat(file_abs)
+        with timed("reload", file=Path(file_abs).name) as m:
+            tables = _load_tables(file_abs, spec)
+            m["rows"] = len(tables["base"])
+        put_entry(key, stat, tables)
+    return (old[1] if old is not None else None), tables
+
+def load_ha_model(cfg: dict, app_key: str, dataset_key: str) -> dict:
+    """
+    Modelo unificado base + H.A. (ver src.logic.ha.build_ha_model) de la version cargada del dataset.
+    La hoja H.A. no se lee con Flat Base: se parsea la primera vez que una pagina la pide y queda
+    en el store (y en su propio snapshot) junto a las tablas del dataset.
+    """
+    tables = load_dataset_tables(cfg, app_key, dataset_key)
+    file_abs, spec, key = _dataset_spec(cfg, app_key, dataset_key)
+    ha_key = f"{key}|ha"
+
+    hit = get_entry(ha_key)
+    if hit is not None and hit[1]["version"] == tables["version"]:
+        cache_result("ha", True)
+        return hit[1]
+    with key_lock(ha_key):
+        hit = get_entry(ha_key)
+        if hit is not None and hit[1]["version"] == tables["version"]:
+            cache_result("ha", True)
+            return hit[1]
+        cache_result("ha", False)
+        with timed("load_ha", file=Path(file_abs).name) as m:
+            model = _load_ha(file_abs, spec, tables)
+            m["rows"] = len(model["ha"])
+        put_entry(ha_key, file_stat(file_abs), model)
+    return model
 
-    # ✅ Flat Base SIEMPRE con header=0
-    base = _read_excel(file_abs, base_sheet, header=0)
-    base = base[[c for c in BASE_COLS if c in base.columns]].copy()
-    base = _normalize_types(base)
+def loaded_tables(cfg: dict, app_key: str, dataset_key: str) -> dict | None:
+    # Tablas que ya estan en el store, sin cargar ni revisar el archivo; None si todavia no se cargo.
+    _, _, key = _dataset_spec(cfg, app_key, dataset_key, must_exist=False)
+    hit = get_entry(key)
+    return hit[1] if hit is not None else None
 
-    # ✅ HA con header=1 (según tus excels)
-    ha = _read_excel(file_abs, ha_sheet, header=ha_header_row)
-    ha = ha[[c for c in HA_COLS if c in ha.columns]].copy()
-    ha = _normalize_types(ha)
+def dataset_loaded(cfg: dict, app_key: str, dataset_key: str) -> bool:
+    return loaded_tables(cfg, app_key, dataset_key) is not None
 
-    important = None
+def dataset_memory(cfg: dict, app_key: str, dataset_key: str) -> dict[str, int] | None:
+    # Bytes por tabla del dataset en el store, o None si todavia no se cargo (o el Excel no existe).
+    _, _, key = _dataset_spec(cfg, app_key, dataset_key, must_exist=False)
+    hit = get_entry(key)
+    return tables_memory(hit[1]) if hit is not None else None
+
+def _with_indexes(tables: dict, sha256: str, file: str = "") -> dict:
+    # Estructuras derivadas: se recalculan en cada carga (son baratas) y no van al snapshot.
+    from src.logic.site_search import build_important_lookup, build_site_index, prejoin_important_cameras
+    from src.logic.split_view import add_hour_rank, build_render_flags, build_split_index, partition_by_split_station
+    from src.logic.timeline import build_timeline
+    from src.logic.workload import build_workload_cube
+
+    def build(index: str, fn, *args):
+        # Cada estructura queda como una etapa "index" con su nombre.
+        with timed("index", file=file, index=index) as m:
+            m["rows"] = len(tables["base"])
+            return fn(*args)
+
+    important_lookup = build("important_lookup", build_important_lookup, tables.get("important_info"))
+    base = build("prejoin", prejoin_important_cameras, tables["base"], important_lookup)
+    base = build("partition", lambda b: partition_by_split_station(add_hour_rank(b)), base)
+    split_index = build("split_index", build_split_index, base)
+    return {
+        **tables,
+        "base": base,
+        "version": sha256[:12],
+        "important_lookup": important_lookup,
+        "split_index": split_index,
+        "render_flags": build("render_flags", build_render_flags, base),
+        "site_index": build("site_index", build_site_index, base),
+        "workload": build("workload", build_workload_cube, base),
+        "timeline": build("timeline", build_timeline, base, split_index),
+    }
+
+def _load_ha(file_abs: str, spec: dict, tables: dict) -> dict:
+    from src.logic.ha import build_ha_model, ha_split_numbers
+
+    ha_sheet = spec["ha_sheet"]
+    name = Path(file_abs).name
+    # Snapshot propio: el de Flat Base no incluye la hoja H.A.
+    ha_spec = {"ha_sheet": ha_sheet, "ha_header_row": spec["ha_header_row"], "part": "ha"}
+
+    with timed("snapshot_read", file=name, part="ha"):
+        cached = load_snapshot(file_abs, ha_spec)
+    cache_result("snapshot", cached is not None, file=name, part="ha")
+    if cached is not None:
+        ha = cached[0]["ha"]
+    else:
+        stat = file_stat(file_abs)
+        sha256 = content_hash(file_abs)
+        with timed("parse", file=name, part="ha") as m:
+            raw = _read_workbook(file_abs, ((ha_sheet, spec["ha_header_row"], tuple(HA_COLS), False),), file_version=sha256)
+            m["rows"] = len(raw[ha_sheet])
+        ha = raw[ha_sheet]
+        ha = ha[[c for c in HA_COLS if c in ha.columns]]
+        if "Split" in ha.columns:
+            # "H.A. 4" -> 4 antes de normalizar (to_numeric lo dejaria nulo).
+            ha = ha.assign(Split=ha_split_numbers(ha["Split"]))
+        ha = _normalize_types(ha)
+        with timed("snapshot_write", file=name, part="ha"):
+            save_snapshot(file_abs, ha_spec, {"ha": ha}, stat=stat, sha256=sha256)
+
+    with timed("index", file=name, index="ha_model") as m:
+        model = build_ha_model(tables["base"], ha)
+        m["rows"] = len(ha)
+    return {"version": tables["version"], **model}
+
+def _load_tables(file_abs: str, spec: dict) -> dict:
+    base_sheet = spec["base_sheet"]
+    important_sheet = spec["important_info_sheet"]
+    name = Path(file_abs).name
+
+    with timed("snapshot_read", file=name):
+        cached = load_snapshot(file_abs, spec)
+    cache_result("snapshot", cached is not None, file=name)
+    if cached is not None:
+        tables, sha256 = cached
+        return _with_indexes(tables, sha256, file=name)
+
+    # Firmar antes de leer: si el archivo cambia a mitad de lectura el snapshot queda invalido.
+    stat = file_stat(file_abs)
+    sha256 = content_hash(file_abs)
+
+    # ✅ Flat Base SIEMPRE con header=0; Important Info! tambien con header=0 y opcional.
+    # La hoja H.A. (header=1) no se lee aca: la carga load_ha_model cuando una pagina la necesita.
+    sheets = [
+        (base_sheet, 0, tuple(BASE_COLS), False),
+    ]
     if important_sheet:
-        try:
-            # ✅ Important Info! también con header=0
-            important = _read_excel(file_abs, important_sheet, header=0)
-            important.columns = [str(c).strip() for c in important.columns]
-        except Exception:
-            important = None
+        sheets.append((important_sheet, 0, None, True))
+    _PARSE_FLAG.parsed = False
+    with timed("parse", file=name) as m:
+        raw = _read_workbook(file_abs, tuple(sheets), file_version=sha256)
+        m["rows"] = sum(len(df) for df in raw.values() if df is not None)
+    cache_result("workbook", not _PARSE_FLAG.parsed, file=name)
+
+    with timed("normalize", file=name) as m:
+        base = raw[base_sheet]
+        base = base[[c for c in BASE_COLS if c in base.columns]]
+        base = _normalize_types(base)
+        m["rows"] = len(base)
+
+    important = raw.get(important_sheet) if important_sheet else None
+    if important is not None:
+        important.columns = [str(c).strip() for c in important.columns]
 
-    return {"base": base, "ha": ha, "important_info": important}
+    tables = {"base": base, "important_info": important}
+    with timed("snapshot_write", file=name):
+        save_snapshot(file_abs, spec, tables, stat=stat, sha256=sha256)
+    return _with_indexes(tables, sha256, file=name)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+from pathlib import Path
+
+from src.config import project_root
+
+# Subir este numero cuando cambie la forma de las tablas normalizadas:
+# invalida todos los snapshots escritos por versiones anteriores.
+SNAPSHOT_FORMAT = 3
+
+def snapshot_dir() -> Path:
+    # MSPLITS_SNAPSHOT_DIR permite mover la cache fuera de la carpeta sincronizada por OneDrive.
+    custom = os.environ.get("MSPLITS_SNAPSHOT_DIR")
+    return Path(custom) if custom else project_root() / ".cache" / "snapshots"
+
+def file_stat(file_abs: str) -> tuple[int, int]:
+    st_ = os.stat(file_abs)
+    return st_.st_mtime_ns, st_.st_size
+
+def content_hash(file_abs: str) -> str:
+    h = hashlib.sha256()
+    with open(file_abs, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+def _snapshot_paths(file_abs: str, spec: dict) -> tuple[Path, Path]:
+    # Un snapshot por (archivo, hojas configuradas, formato).
+    ident = json.dumps(
+        {"file": str(Path(file_abs).resolve()), "spec": spec, "format": SNAPSHOT_FORMAT},
+        sort_keys=True,
+    )
+    name = hashlib.sha1(ident.encode("utf-8")).hexdigest()[:20]
+    d = snapshot_dir()
+    return d / f"{name}.json", d / f"{name}.pkl"
+
+def _read_meta(meta_path: Path) -> dict | None:
+    try:
+        with meta_path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def load_snapshot(file_abs: str, spec: dict) -> tuple[dict, str] | None:
+    """
+    Devuelve (tablas, content_hash) si hay un snapshot vigente para el Excel, o None.
+    Primero compara mtime+size; solo si difieren recalcula el hash del contenido
+    (OneDrive a veces toca el mtime sin cambiar el archivo).
+    """
+    meta_path, data_path = _snapshot_paths(file_abs, spec)
+    meta = _read_meta(meta_path)
+    if meta is None or meta.get("format") != SNAPSHOT_FORMAT or not data_path.exists():
+        return None
+
+    mtime_ns, size = file_stat(file_abs)
+    if (meta.get("mtime_ns"), meta.get("size")) != (mtime_ns, size):
+        if meta.get("size") != size or meta.get("sha256") != content_hash(file_abs):
+            return None
+        # Mismo contenido con otro mtime: refrescar meta para evitar re-hashear.
+        meta["mtime_ns"] = mtime_ns
+        try:
+            _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+        except OSError:
+            pass
+
+    try:
+        with data_path.open("rb") as f:
+            tables = pickle.load(f)
+    except Exception:
+        return None
+    return tables, meta["sha256"]
+
+def save_snapshot(file_abs: str, spec: dict, tables: dict, stat: tuple[int, int], sha256: str) -> None:
+    # stat/sha256 deben tomarse ANTES de leer el Excel: si el archivo cambia
+    # durante la lectura, el snapshot queda viejo y se invalida en la siguiente carga.
+    meta_path, data_path = _snapshot_paths(file_abs, spec)
+    meta = {
+        "file": str(Path(file_abs).resolve()),
+        "format": SNAPSHOT_FORMAT,
+        "mtime_ns": stat[0],
+        "size": stat[1],
+        "sha256": sha256,
+    }
+    try:
+        meta_path.parent.mkdir(parents=True, exist_ok=True)
+        _write_atomic(data_path, pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL))
+        _write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+    except OSError:
+        # La cache es opcional: si no se puede escribir (disco de solo lectura, etc.) se sigue sin ella.
+        pass
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import threading
+
+import pandas as pd
+
+# Streamlit corre todas las sesiones como hilos de un mismo proceso: este store guarda UNA
+# copia de las tablas de cada Excel por servidor y todas las sesiones leen de ella.
+
+_ENTRIES: dict[str, tuple[tuple[int, int], dict]] = {}
+_LOCKS: dict[str, threading.Lock] = {}
+_LOCKS_GUARD = threading.Lock()
+
+def enable_copy_on_write() -> None:
+    """
+    Copy-on-write de pandas para todo el proceso: cortes (iloc), proyecciones de columnas y
+    reset_index devuelven vistas sobre los buffers del store en vez de copias, y si una pagina
+    escribe sobre lo que recibio pandas copia solo esa columna: las tablas compartidas nunca se
+    modifican. Cambia el comportamiento de pandas en todo el proceso, por eso no se activa al
+    importar este modulo sino explicitamente en los puntos de entrada (paginas, API, bench_suite).
+    """
+    pd.set_option("mode.copy_on_write", True)
+
+def key_lock(key: str) -> threading.Lock:
+    with _LOCKS_GUARD:
+        return _LOCKS.setdefault(key, threading.Lock())
+
+def get_entry(key: str) -> tuple[tuple[int, int], dict] | None:
+    return _ENTRIES.get(key)
+
+def put_entry(key: str, stat: tuple[int, int], tables: dict) -> None:
+    # Una sola asignacion: quien lea la llave ve la version anterior completa o la nueva completa.
+    _ENTRIES[key] = (stat, tables)
+
+def tables_memory(tables: dict) -> dict[str, int]:
+    # Bytes por tabla (memory_usage deep: incluye los textos de columnas object/category).
+    out = {}
+    for name in ("base", "ha", "important_info"):
+        df = tables.get(name)
+        if isinstance(df, pd.DataFrame):
+            out[name] = int(df.memory_usage(deep=True, index=True).sum())
+    return out
+
+def memory_report() -> list[dict]:
+    rows = []
+    for key, (_, tables) in list(_ENTRIES.items()):
+        usage = tables_memory(tables)
+        rows.append({"key": key, "version": tables.get("version"), **usage, "total": sum(usage.values())})
+    return rows
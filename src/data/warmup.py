@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.config import config_datasets, dataset_config
+from src.data.excel_loader import load_dataset_tables
+from src.data.snapshot import file_stat
+
+# Hilos y no procesos: el resultado tiene que quedar en la cache en memoria de ESTE proceso,
+# y despues del primer arranque casi todo el trabajo es leer snapshots de disco.
+_MAX_WORKERS = 4
+
+_EXECUTOR: ThreadPoolExecutor | None = None
+_STATUS: dict[str, dict] = {}
+_LOCK = threading.Lock()
+_STARTED = False
+
+def dataset_pairs(cfg: dict) -> list[tuple[str, str]]:
+    return [(ds.app_key, ds.dataset_key) for ds in config_datasets(cfg)]
+
+def _season_free_label(label: str) -> str:
+    text = str(label or "").lower().replace("–", "-").replace("—", "-")
+    text = re.sub(r"\b(?:nov\s*(?:->|to|-|a)?\s*mar|mar\s*(?:->|to|-|a)?\s*nov)\b", "", text)
+    return re.sub(r"[\s\-]+", " ", text).strip()
+
+def twin_dataset(cfg: dict, app_key: str, dataset_key: str) -> tuple[str, str] | None:
+    # El "gemelo" es el mismo archivo de la otra temporada (ej: Friday MAR->NOV <-> Friday NOV->MAR).
+    datasets = [ds for ds in config_datasets(cfg) if ds.app_key == app_key]
+    current = next((ds for ds in datasets if ds.dataset_key == dataset_key), None)
+    if current is None or current.season is None:
+        return None
+    label = _season_free_label(current.label)
+
+    others = [ds for ds in datasets if ds.dataset_key != dataset_key and ds.season not in (None, current.season)]
+    same_label = [ds for ds in others if _season_free_label(ds.label) == label]
+    if same_label:
+        return app_key, same_label[0].dataset_key
+    if len(others) == 1:
+        return app_key, others[0].dataset_key
+    return None
+
+def _run(cfg: dict, app_key: str, dataset_key: str) -> None:
+    item_id = f"{app_key}::{dataset_key}"
+    with _LOCK:
+        _STATUS[item_id]["state"] = "loading"
+    t0 = time.perf_counter()
+    try:
+        load_dataset_tables(cfg, app_key, dataset_key)
+        state, error = "ok", None
+    except Exception as e:
+        state, error = "error", str(e)
+    with _LOCK:
+        _STATUS[item_id].update(state=state, error=error, seconds=time.perf_counter() - t0)
+
+def _stat_or_none(file_abs: str) -> tuple[int, int] | None:
+    try:
+        return file_stat(file_abs)
+    except OSError:
+        return None
+
+def _submit(cfg: dict, app_key: str, dataset_key: str, reason: str) -> None:
+    # Se vuelve a encolar si apps.yml ahora apunta el dataset a otro Excel, o si fallo y el archivo
+    # cambio desde ese intento (mtime/tamano): un Excel roto o bloqueado no se re-parsea en cada rerun.
+    global _EXECUTOR
+    item_id = f"{app_key}::{dataset_key}"
+    file_abs = dataset_config(cfg, app_key, dataset_key).file_abs
+    stat = _stat_or_none(file_abs)
+    with _LOCK:
+        prev = _STATUS.get(item_id)
+        if prev is not None and prev["file"] == file_abs and (prev["state"] != "error" or prev["stat"] == stat):
+            return
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="msplits-warmup")
+        _STATUS[item_id] = {
+            "id": item_id,
+            "app_key": app_key,
+            "dataset_key": dataset_key,
+            "file": file_abs,
+            "stat": stat,
+            "reason": reason,
+            "state": "pending",
+            "seconds": None,
+            "error": None,
+        }
+        executor = _EXECUTOR
+    executor.submit(_run, cfg, app_key, dataset_key)
+
+def start_warmup(cfg: dict) -> None:
+    """
+    Encola los datasets de cfg que todavia no se precargaron. Las paginas la llaman en cada
+    rerun con el apps.yml vigente: un dataset agregado o apuntado a otro Excel despues del
+    arranque tambien se precarga, y los que se quitaron salen del estado.
+    """
+    global _STARTED
+    pairs = dataset_pairs(cfg)
+    with _LOCK:
+        _STARTED = True
+        current = {f"{a}::{d}" for a, d in pairs}
+        for item_id in [i for i in _STATUS if i not in current]:
+            del _STATUS[item_id]
+    for app_key, dataset_key in pairs:
+        _submit(cfg, app_key, dataset_key, reason="warmup")
+
+def sync_warmup(cfg: dict) -> None:
+    # Como start_warmup, pero solo si la precarga ya se inicio en este proceso (API por pedido).
+    if _STARTED:
+        start_warmup(cfg)
+
+def prefetch_twin(cfg: dict, app_key: str, dataset_key: str) -> None:
+    twin = twin_dataset(cfg, app_key, dataset_key)
+    if twin is not None:
+        _submit(cfg, twin[0], twin[1], reason="prefetch")
+
+def warmup_status() -> list[dict]:
+    with _LOCK:
+        return [dict(v) for v in _STATUS.values()]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import pandas as pd
+
+from src.config import config_datasets, load_apps_config
+from src.data.excel_loader import reload_dataset_tables, set_auto_revalidate
+from src.data.snapshot import file_stat
+
+# Polling simple en vez de eventos del sistema de archivos: OneDrive reemplaza los
+# archivos de formas distintas segun la plataforma y un stat cada pocos segundos es barato.
+POLL_SECONDS = 2.0
+# Cuanto tiempo tiene que quedarse quieto (mismo mtime/size) un Excel antes de recargarlo.
+SETTLE_SECONDS = 5.0
+MAX_CHANGES = 50
+
+DIFF_KEYS = ["Split", "Station", "Site"]
+
+_LOCK = threading.Lock()
+_THREAD: threading.Thread | None = None
+_CHANGES: list[dict] = []
+
+def _watched_files(cfg: dict) -> dict[str, list[tuple[str, str]]]:
+    # archivo absoluto -> [(app_key, dataset_key), ...] que lo usan
+    out: dict[str, list[tuple[str, str]]] = {}
+    for ds in config_datasets(cfg):
+        out.setdefault(ds.file_abs, []).append((ds.app_key, ds.dataset_key))
+    return out
+
+def _is_readable(file_abs: str) -> bool:
+    # Mientras OneDrive/Excel escriben, abrir el archivo puede fallar: se reintenta en el siguiente ciclo.
+    try:
+        with open(file_abs, "rb") as f:
+            f.read(1)
+        return True
+    except OSError:
+        return False
+
+def _row_tuples(df: pd.DataFrame, cols: list[str]) -> list[tuple]:
+    f = df[cols].astype(object).where(df[cols].notna(), None)
+    return list(f.itertuples(index=False, name=None))
+
+def diff_base_rows(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compara dos versiones de Flat Base fila a fila (como multiconjunto: hay filas repetidas).
+    Devuelve una fila por (Split, Station, Site) afectado con Cambio = agregado/eliminado/modificado.
+    """
+    # Las columnas internas ("__hour_rank__") se derivan de las del Excel: no cuentan como cambio.
+    cols = [c for c in new.columns if c in old.columns and not str(c).startswith("__")]
+    keys = [c for c in DIFF_KEYS if c in cols]
+    out_cols = keys + ["Cambio", "Columnas"]
+    if not keys:
+        return pd.DataFrame(columns=out_cols)
+
+    old_rows = Counter(_row_tuples(old, cols))
+    new_rows = Counter(_row_tuples(new, cols))
+    added = new_rows - old_rows
+    removed = old_rows - new_rows
+
+    key_pos = [cols.index(k) for k in keys]
+    by_key: dict[tuple, dict[str, list[tuple]]] = {}
+    for row in added.elements():
+        by_key.setdefault(tuple(row[i] for i in key_pos), {"a": [], "r": []})["a"].append(row)
+    for row in removed.elements():
+        by_key.setdefault(tuple(row[i] for i in key_pos), {"a": [], "r": []})["r"].append(row)
+
+    records = []
+    for key, rows in by_key.items():
+        if rows["a"] and rows["r"]:
+            a, r = rows["a"][0], rows["r"][0]
+            changed = [c for c, x, y in zip(cols, a, r) if x != y]
+            records.append(dict(zip(keys, key), Cambio="modificado", Columnas=", ".join(changed)))
+        else:
+            records.append(dict(zip(keys, key), Cambio="agregado" if rows["a"] else "eliminado", Columnas=""))
+
+    if not records:
+        return pd.DataFrame(columns=out_cols)
+    return pd.DataFrame.from_records(records, columns=out_cols).sort_values(keys, na_position="last").reset_index(drop=True)
+
+def _reload(cfg: dict, datasets: list[tuple[str, str]]) -> bool:
+    # Devuelve False si algun dataset no se pudo recargar (hay que reintentar).
+    ok = True
+    for app_key, dataset_key in datasets:
+        try:
+            old, new = reload_dataset_tables(cfg, app_key, dataset_key)
+        except Exception:
+            # Archivo a medio escribir o bloqueado: se conserva la version anterior en memoria.
+            ok = False
+            continue
+        if old is None or old.get("version") == new.get("version"):
+            continue
+        diff = diff_base_rows(old["base"], new["base"])
+        with _LOCK:
+            _CHANGES.append(
+                {
+                    "app_key": app_key,
+                    "dataset_key": dataset_key,
+                    "at": datetime.now(),
+                    "version_old": old.get("version"),
+                    "version_new": new.get("version"),
+                    "diff": diff,
+                    "summary": diff["Cambio"].value_counts().to_dict(),
+                }
+            )
+            del _CHANGES[:-MAX_CHANGES]
+    return ok
+
+def _current_config(cfg: dict) -> dict:
+    # apps.yml se vuelve a leer en cada ciclo (es un stat mientras no cambie); si quedo invalido
+    # a medio editar se sigue vigilando con la ultima version buena.
+    try:
+        return load_apps_config()
+    except (OSError, ValueError):
+        return cfg
+
+def _loop(cfg: dict) -> None:
+    known: dict[str, tuple[int, int] | None] = {}
+    changed_at: dict[str, float] = {}
+
+    while True:
+        cfg = _current_config(cfg)
+        files = _watched_files(cfg)
+        for file_abs in [f for f in known if f not in files]:
+            known.pop(file_abs)
+            changed_at.pop(file_abs, None)
+        for file_abs in files:
+            if file_abs not in known:
+                # Archivo nuevo en la config: se toma su estado actual, la primera carga la hace la pagina o el warm-up.
+                try:
+                    known[file_abs] = file_stat(file_abs)
+                except OSError:
+                    known[file_abs] = None
+
+        time.sleep(POLL_SECONDS)
+        now = time.monotonic()
+        for file_abs, datasets in files.items():
+            try:
+                stat = file_stat(file_abs)
+            except OSError:
+                # OneDrive puede borrar y recrear el archivo: esperar a que reaparezca.
+                continue
+            if stat != known.get(file_abs):
+                known[file_abs] = stat
+                changed_at[file_abs] = now
+                continue
+            if file_abs in changed_at and now - changed_at[file_abs] >= SETTLE_SECONDS:
+                if not _is_readable(file_abs):
+                    continue
+                try:
+                    reloaded = _reload(cfg, datasets)
+                except Exception:
+                    # El hilo no debe morir: sin el, las sesiones se quedarian con la version vieja.
+                    reloaded = False
+                if reloaded:
+                    del changed_at[file_abs]
+                else:
+                    changed_at[file_abs] = now
+
+def start_watcher(cfg: dict) -> None:
+    # Idempotente: un solo hilo por proceso. cfg solo se usa si apps.yml no se puede leer;
+    # el hilo vigila los Excel del apps.yml vigente en cada ciclo.
+    global _THREAD
+    with _LOCK:
+        if _THREAD is not None and _THREAD.is_alive():
+            return
+        set_auto_revalidate(False)
+        _THREAD = threading.Thread(target=_loop, args=(cfg,), name="msplits-watcher", daemon=True)
+        _THREAD.start()
+
+def dataset_changes(app_key: str, dataset_key: str) -> list[dict]:
+    # Cambios detectados para un dataset, del mas reciente al mas antiguo.
+    with _LOCK:
+        return [c for c in reversed(_CHANGES) if (c["app_key"], c["dataset_key"]) == (app_key, dataset_key)]
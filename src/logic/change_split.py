@@ -1,25 +1,130 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 
-def compare_splits_for_station(df: pd.DataFrame, split_a: int, split_b: int, station: int) -> tuple[pd.DataFrame, pd.DataFrame]:
+from src.logic.split_view import as_text, split_rows
+
+def _site_text(s: pd.Series) -> pd.Series:
+    return as_text(s).str.strip()
+
+def _station_rows(df: pd.DataFrame, split: int, station: int, index: dict | None) -> pd.DataFrame:
+    # Con indice es el corte contiguo de la particion (sin escanear el frame completo).
+    if index is not None:
+        return df.iloc[index["parts"].get((int(split), int(station)), slice(0, 0))]
+    return df[(df["Split"] == split) & (df["Station"] == station)]
+
+def compare_splits_for_station(df: pd.DataFrame, split_a: int, split_b: int, station: int, index: dict | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
     Devuelve:
       added: sitios que aparecen en Split B y no en Split A (para la misma station)
       removed: sitios que aparecen en Split A y no en Split B
+    index: split_index del mismo df (opcional).
     """
-    a = df[(df["Split"] == split_a) & (df["Station"] == station)].copy()
-    b = df[(df["Split"] == split_b) & (df["Station"] == station)].copy()
+    # Solo las columnas de salida: los filtros siguientes no copian el resto del frame.
+    keep_cols = [c for c in ["Hour","Time","Site","Drop time","ID","Notes*"] if c in df.columns]
+    a = _station_rows(df, split_a, station, index)[keep_cols]
+    b = _station_rows(df, split_b, station, index)[keep_cols]
+    if "Site" not in keep_cols:
+        return b.iloc[0:0].reset_index(drop=True), a.iloc[0:0].reset_index(drop=True)
 
-    # Normalizar Site (por si hay espacios)
-    a_sites = set(a["Site"].dropna().astype(str).str.strip().tolist()) if "Site" in a.columns else set()
-    b_sites = set(b["Site"].dropna().astype(str).str.strip().tolist()) if "Site" in b.columns else set()
+    # Normalizar Site (por si hay espacios); el texto se calcula una vez por lado.
+    a_text = _site_text(a["Site"])
+    b_text = _site_text(b["Site"])
+    a_sites = set(a_text[a["Site"].notna().to_numpy()].tolist())
+    b_sites = set(b_text[b["Site"].notna().to_numpy()].tolist())
 
     added_sites = sorted(list(b_sites - a_sites))
     removed_sites = sorted(list(a_sites - b_sites))
 
-    # Crear dataframes bonitos con columnas mínimas
-    added = b[b["Site"].astype(str).str.strip().isin(added_sites)].copy() if added_sites else b.iloc[0:0].copy()
-    removed = a[a["Site"].astype(str).str.strip().isin(removed_sites)].copy() if removed_sites else a.iloc[0:0].copy()
+    added = b[b_text.isin(added_sites).to_numpy()] if added_sites else b.iloc[0:0]
+    removed = a[a_text.isin(removed_sites).to_numpy()] if removed_sites else a.iloc[0:0]
+    return added.reset_index(drop=True), removed.reset_index(drop=True)
 
-    keep_cols = [c for c in ["Hour","Time","Site","Drop time","ID","Notes*"] if c in df.columns]
-    return added[keep_cols].reset_index(drop=True), removed[keep_cols].reset_index(drop=True)
+DIFF_CHANGE_LABELS = {
+    "same": "sin cambio",
+    "moved": "cambia de estacion",
+    "added": "solo en B",
+    "removed": "solo en A",
+}
+
+def _station_masks(df: pd.DataFrame, split: int, index: dict | None) -> pd.DataFrame:
+    # Una fila por sitio con sus estaciones como bitmask (bit n = station n) y la primera hora/ID.
+    rows = split_rows(df, split, index=index)
+    cols = [c for c in ["Site", "Station", "Hour", "ID"] if c in rows.columns]
+    rows = rows[cols].dropna(subset=["Site", "Station"])
+    pairs = pd.DataFrame(
+        {
+            "Site": _site_text(rows["Site"]).to_numpy(),
+            "bit": np.left_shift(np.int64(1), rows["Station"].to_numpy(dtype=np.int64)),
+            "Hour": rows["Hour"].astype(object).to_numpy() if "Hour" in rows.columns else None,
+            "ID": rows["ID"].to_numpy() if "ID" in rows.columns else None,
+        }
+    )
+    pairs = pairs.drop_duplicates(subset=["Site", "bit"])
+    return pairs.groupby("Site", sort=False).agg(mask=("bit", "sum"), Hour=("Hour", "first"), ID=("ID", "first"))
+
+def _mask_to_text(mask: int) -> str:
+    return ", ".join(str(n) for n in range(64) if mask >> n & 1)
+
+def _lowest_station(masks: np.ndarray) -> np.ndarray:
+    # Numero de la estacion mas baja de cada mascara (0 si la mascara esta vacia).
+    low = masks & -masks
+    return np.where(masks > 0, np.log2(np.maximum(low, 1)).astype(np.int64), 0)
+
+def diff_splits(
+    df_a: pd.DataFrame,
+    split_a: int,
+    df_b: pd.DataFrame,
+    split_b: int,
+    index_a: dict | None = None,
+    index_b: dict | None = None,
+) -> pd.DataFrame:
+    """
+    Tabla de reasignacion de TODOS los sitios al pasar de (df_a, split_a) a (df_b, split_b).
+    Sirve para un mismo archivo (split 6 -> 5) o entre temporadas (MAR->NOV vs NOV->MAR).
+    Columnas: Site, ID, Hour, Station A, Station B, Cambio.
+    """
+    a = _station_masks(df_a, split_a, index_a)
+    b = _station_masks(df_b, split_b, index_b)
+    m = a.join(b, how="outer", lsuffix="_a", rsuffix="_b")
+
+    mask_a = m["mask_a"].fillna(0).astype(np.int64).to_numpy()
+    mask_b = m["mask_b"].fillna(0).astype(np.int64).to_numpy()
+    kind = np.select(
+        [mask_a == 0, mask_b == 0, mask_a == mask_b],
+        ["added", "removed", "same"],
+        default="moved",
+    )
+
+    # El texto de estaciones se arma por mascara unica (pocas), no por fila.
+    texts = {v: _mask_to_text(int(v)) for v in np.unique(np.concatenate([mask_a, mask_b]))}
+    out = pd.DataFrame(
+        {
+            "Site": m.index.to_numpy(),
+            "ID": m["ID_b"].combine_first(m["ID_a"]).to_numpy(),
+            "Hour": m["Hour_b"].combine_first(m["Hour_a"]).to_numpy(),
+            "Station A": [texts[v] for v in mask_a],
+            "Station B": [texts[v] for v in mask_b],
+            "Cambio": pd.Series(kind).map(DIFF_CHANGE_LABELS).to_numpy(),
+            # Orden: por estacion en B; los sitios que salen van al final, por su estacion en A.
+            "_order": np.where(mask_b > 0, _lowest_station(mask_b), 100 + _lowest_station(mask_a)),
+        }
+    )
+    out = out.sort_values(["_order", "Site"], kind="stable").drop(columns="_order").reset_index(drop=True)
+    out["ID"] = out["ID"].astype("Int64")
+    return out
+
+def diff_station_summary(diff: pd.DataFrame) -> pd.DataFrame:
+    # Resumen por estacion de una tabla de diff_splits: sitios que quedan, entran y salen.
+    def _explode(col: str) -> pd.DataFrame:
+        s = diff[col].str.split(", ").explode()
+        s = s[s.astype(bool) & s.notna()]
+        return pd.DataFrame({"Site": diff.loc[s.index, "Site"].to_numpy(), "Station": s.astype(int).to_numpy()})
+
+    a = _explode("Station A")
+    b = _explode("Station B")
+    both = a.merge(b, on=["Site", "Station"], how="outer", indicator=True)
+    counts = pd.crosstab(both["Station"], both["_merge"]).reindex(columns=["both", "right_only", "left_only"], fill_value=0)
+    counts.columns = ["Se quedan", "Entran", "Salen"]
+    counts.index.name = "Station"
+    return counts.reset_index()
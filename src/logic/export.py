@@ -0,0 +1,73 @@
+from __future__ import annotations
+import io
+import zipfile
+from typing import Iterator
+
+import pandas as pd
+
+from src.logic.split_view import build_split_view, get_stations_for_split
+
+# Filas por bloque al escribir: nunca se arma el CSV/XLSX completo de un frame como un solo string.
+CHUNK_ROWS = 2000
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+def iter_csv_chunks(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[str]:
+    # Encabezado en el primer bloque; un frame vacio produce solo el encabezado.
+    yield df.iloc[0:0].to_csv(index=False)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=False)
+
+def _iter_rows(df: pd.DataFrame, chunk_rows: int = CHUNK_ROWS) -> Iterator[tuple]:
+    # Filas como tuplas de Python con None en lugar de NA (openpyxl no acepta pd.NA).
+    for start in range(0, len(df), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows].astype(object)
+        yield from chunk.where(chunk.notna(), None).itertuples(index=False, name=None)
+
+def write_csv(df: pd.DataFrame, out) -> int:
+    # out: archivo binario abierto. Devuelve las filas escritas.
+    for chunk in iter_csv_chunks(df):
+        out.write(chunk.encode("utf-8"))
+    return len(df)
+
+def frame_csv(df: pd.DataFrame) -> bytes:
+    buf = io.BytesIO()
+    write_csv(df, buf)
+    return buf.getvalue()
+
+def split_station_views(tables: dict, split: int, extended: bool) -> Iterator[tuple[int, pd.DataFrame]]:
+    """
+    (station, vista) de cada station del split, en orden. Cada vista es un corte de la particion
+    ya ordenada de la carga (split_index): no se arma un frame grande con todo el split.
+    """
+    df = tables["base"]
+    index = tables.get("split_index")
+    for station in get_stations_for_split(df, split):
+        yield station, build_split_view(df, split, station, extended, index=index)
+
+def split_zip(tables: dict, split: int, extended: bool) -> tuple[bytes, int]:
+    # Un CSV por station dentro de un zip; cada CSV se escribe por bloques directo al zip.
+    buf = io.BytesIO()
+    rows = 0
+    with zipfile.ZipFile(buf, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for station, view in split_station_views(tables, split, extended):
+            with zf.open(f"split_{split}_station_{station}.csv", "w") as f:
+                rows += write_csv(view, f)
+    return buf.getvalue(), rows
+
+def split_xlsx(tables: dict, split: int, extended: bool) -> tuple[bytes, int]:
+    # Una hoja por station. openpyxl en modo write_only vuelca cada hoja a disco mientras se escribe.
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    rows = 0
+    for station, view in split_station_views(tables, split, extended):
+        ws = wb.create_sheet(title=f"Station {station}")
+        ws.append([str(c) for c in view.columns])
+        for row in _iter_rows(view):
+            ws.append(row)
+        rows += len(view)
+    if not wb.worksheets:
+        wb.create_sheet(title=f"Split {split}")
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue(), rows
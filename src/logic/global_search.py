@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import threading
+
+import pandas as pd
+
+from src.config import config_datasets, dataset_config
+from src.data.excel_loader import loaded_tables
+from src.data.warmup import warmup_status
+from src.logic.site_search import build_site_index, rank_sites
+
+PLACEMENT_COLS = ["App", "Archivo", "Split", "Station", "Hour", "Site", "app_key", "dataset_key"]
+
+# Indice global compartido por todas las sesiones. Se reconstruye por partes: solo se recalcula
+# la parte de un dataset cuando cambia su version. Se arma fuera del lock con los datasets que ya
+# estan en memoria (la precarga carga el resto); el lock solo cubre el cambio de estado.
+_LOCK = threading.Lock()
+_STATE: dict = {"parts": {}, "versions": {}, "frame": None, "index": None, "generation": 0}
+
+def _placements(cfg: dict, app_key: str, dataset_key: str, tables: dict) -> pd.DataFrame:
+    ds = dataset_config(cfg, app_key, dataset_key)
+    base = tables["base"]
+    cols = [c for c in ["Split", "Station", "Hour", "Site"] if c in base.columns]
+    part = base[cols].dropna(subset=["Site"] if "Site" in cols else None)
+    return part.assign(
+        App=ds.app_label,
+        Archivo=ds.label,
+        app_key=app_key,
+        dataset_key=dataset_key,
+    )
+
+def get_global_index(cfg: dict) -> tuple[pd.DataFrame, dict]:
+    """
+    Devuelve (placements, site_index) sobre los datasets de apps.yml que ya estan en memoria.
+    placements tiene una fila por (app, dataset, split, station, hour, site).
+    Nunca lee un Excel: los que siguen cargando se suman en una llamada posterior (loading_datasets).
+    """
+    pairs = [(ds.app_key, ds.dataset_key) for ds in config_datasets(cfg)]
+    with _LOCK:
+        parts = dict(_STATE["parts"])
+        versions = dict(_STATE["versions"])
+        frame, index, generation = _STATE["frame"], _STATE["index"], _STATE["generation"]
+
+    changed = False
+    for pair in pairs:
+        tables = loaded_tables(cfg, *pair)
+        if tables is None or versions.get(pair) == tables.get("version"):
+            continue
+        parts[pair] = _placements(cfg, pair[0], pair[1], tables)
+        versions[pair] = tables.get("version")
+        changed = True
+    for pair in [p for p in parts if p not in pairs]:
+        del parts[pair]
+        del versions[pair]
+        changed = True
+    if not changed and frame is not None:
+        return frame, index
+
+    non_empty = [p for p in parts.values() if not p.empty]
+    frame = pd.concat(non_empty, ignore_index=True) if non_empty else pd.DataFrame(columns=PLACEMENT_COLS)
+    frame = frame[[c for c in PLACEMENT_COLS if c in frame.columns]]
+    index = build_site_index(frame)
+    with _LOCK:
+        # Si otra sesion publico un indice mientras se armaba este, se deja el suyo.
+        if _STATE["generation"] == generation:
+            _STATE.update(parts=parts, versions=versions, frame=frame, index=index, generation=generation + 1)
+    return frame, index
+
+def loading_datasets(cfg: dict) -> list[str]:
+    # Archivos que todavia no estan en memoria y siguen en la precarga (los que fallaron no se esperan).
+    status = {s["id"]: s["state"] for s in warmup_status()}
+    return [
+        ds.full_label
+        for ds in config_datasets(cfg)
+        if status.get(ds.id) != "error" and loaded_tables(cfg, ds.app_key, ds.dataset_key) is None
+    ]
+
+def find_site_everywhere(cfg: dict, site_name: str) -> pd.DataFrame:
+    # Todas las ubicaciones (app, archivo, split, station, hora) de un sitio exacto.
+    frame, index = get_global_index(cfg)
+    pos = index["positions"].get(site_name.strip().lower())
+    if pos is None:
+        return frame.iloc[0:0]
+    return frame.iloc[pos].sort_values(["App", "Archivo", "Split", "Station"]).reset_index(drop=True)
+
+def suggest_sites_everywhere(cfg: dict, query: str, limit: int = 30) -> list[str]:
+    _, index = get_global_index(cfg)
+    return rank_sites(query, index, limit=limit)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+import re
+
+import numpy as np
+import pandas as pd
+
+from src.logic.split_view import add_hour_rank, build_split_index, partition_by_split_station
+
+# Hoja " (H.A.) Flat Base": el reparto de High Alert. Su columna Split trae "H.A. 4" (split H.A. de
+# 4 operadores) y el resto de columnas es igual a Flat Base. Se carga aparte y solo cuando una pagina
+# la pide (ver excel_loader.load_ha_model).
+HA_SPLIT_RE = re.compile(r"(\d+)")
+IN_BASE_COL = "En split normal"
+HA_FLAG_COL = "H.A."
+HA_VIEW_COLS = ["Hour", "Time", "Site", "Drop time", "SUNDAY (D.T.)", "Notes*"]
+
+def ha_split_numbers(values: pd.Series) -> pd.Series:
+    # "H.A. 4" -> 4 (tambien acepta un numero suelto); se parsea una vez por valor unico.
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    nums = [HA_SPLIT_RE.search(str(u)) for u in uniques]
+    per_unique = pd.array([int(m.group(1)) if m else pd.NA for m in nums] + [pd.NA], dtype="Int64")
+    return pd.Series(per_unique[codes], index=values.index, name=values.name)
+
+def site_keys(sites: pd.Series) -> np.ndarray:
+    # Llave normalizada de sitio (strip + minusculas), la misma que usa el indice de busqueda.
+    codes, uniques = pd.factorize(sites, use_na_sentinel=True)
+    keys = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower().to_numpy(dtype=object)
+    return np.append(keys, None)[codes]
+
+def _placements(df: pd.DataFrame, keys: np.ndarray) -> pd.MultiIndex:
+    return pd.MultiIndex.from_arrays([df["Split"].to_numpy(), df["Station"].to_numpy(), keys])
+
+def build_ha_model(base: pd.DataFrame, ha: pd.DataFrame) -> dict:
+    """
+    Modelo unificado base + H.A., armado una vez por version del Excel:
+      ha:             filas H.A. ordenadas por (Split, Station, hora); IN_BASE_COL marca las que
+                      tambien estan en Flat Base en el mismo (split, station, sitio)
+      split_index:    particiones (split, station) -> slice sobre ha, igual que en Flat Base
+      base_flag:      alineado con base: la fila tambien figura en H.A. en el mismo (split, station)
+      site_positions: llave de sitio -> posiciones en ha
+    """
+    ha = partition_by_split_station(add_hour_rank(ha))
+    ha_keys = site_keys(ha["Site"]) if "Site" in ha.columns else np.full(len(ha), None, dtype=object)
+    base_keys = site_keys(base["Site"]) if "Site" in base.columns else np.full(len(base), None, dtype=object)
+
+    ha_at = _placements(ha, ha_keys)
+    base_at = _placements(base, base_keys)
+    ha = ha.assign(**{IN_BASE_COL: ha_at.isin(base_at)})
+
+    valid = pd.notna(ha_keys)
+    positions = pd.Series(np.flatnonzero(valid)).groupby(ha_keys[valid]).indices
+    return {
+        "ha": ha,
+        "split_index": build_split_index(ha),
+        "base_flag": np.asarray(base_at.isin(ha_at), dtype=bool),
+        "site_positions": {k: np.flatnonzero(valid)[v] for k, v in positions.items()},
+    }
+
+def ha_view(model: dict, split: int, station: int) -> pd.DataFrame:
+    # Sitios H.A. de (split, station): un corte de la particion, sin filtrar en cada rerun.
+    ha = model["ha"]
+    rows = ha.iloc[model["split_index"]["parts"].get((int(split), int(station)), slice(0, 0))]
+    cols = [c for c in HA_VIEW_COLS + [IN_BASE_COL] if c in rows.columns]
+    return rows[cols].reset_index(drop=True)
+
+def ha_placements(model: dict, site_name: str) -> pd.DataFrame:
+    # Donde aparece el sitio en el reparto H.A. (split H.A., station, hora).
+    pos = model["site_positions"].get(str(site_name).strip().lower(), np.empty(0, dtype=np.int64))
+    rows = model["ha"].iloc[pos]
+    cols = [c for c in ["Split", "Station", "Hour", "Drop time", IN_BASE_COL] if c in rows.columns]
+    out = rows[cols].reset_index(drop=True)
+    return out.rename(columns={"Split": "Split H.A."})
+
+def suggest_ha_sites(model: dict, query: str, limit: int = 30) -> list[str]:
+    # Sitios que solo estan en el reparto H.A. tambien se pueden buscar (texto parcial).
+    q = query.strip().lower()
+    if not q:
+        return []
+    ha = model["ha"]
+    hits = [pos[0] for key, pos in model["site_positions"].items() if q in key]
+    return [str(ha["Site"].iloc[p]).strip() for p in sorted(hits)[:limit]]
@@ -1,59 +1,302 @@
 from __future__ import annotations
+import re
+import numpy as np
 import pandas as pd
 
+from src.logic.split_view import as_text
+
 COLS_PREF = ["Split","Station","Hour","Time","Site","Drop time","ID","Notes*","SIG Tools","Map"]
+# Columnas de Important Info! que tambien existen (con otro nombre) en Flat Base.
+IMPORTANT_TO_BASE = {
+    "GATES": "Gates",
+    "ENTRANCES": "Entrances",
+    "LPR GATES": "LPR",
+    "PTZ": "PTZ",
+    "IMPORTANT CAMERAS": "Important Cameras",
+}
+NGRAM = 3
+# Similitud minima (0..1) para aceptar una coincidencia aproximada de nombre completo.
+FUZZY_MIN_SCORE = 0.6
 
 def _project_search_cols(df: pd.DataFrame) -> pd.DataFrame:
     cols = [c for c in COLS_PREF if c in df.columns]
     return df[cols] if cols else df
 
-def suggest_sites(df: pd.DataFrame, query: str, limit: int = 30) -> list[str]:
+def _ngrams(text: str) -> set[str]:
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+def _tokens(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9]+", text)
+
+def build_site_index(df: pd.DataFrame) -> dict:
+    """
+    Indice de busqueda de sitios, construido una vez por carga de dataset:
+      names:     nombres unicos (strip) en orden de aparicion
+      norm:      mismo orden, en minusculas (clave de busqueda)
+      splits:    splits donde aparece cada nombre
+      positions: nombre normalizado -> posiciones de fila en df
+      grams:     trigrama -> ids de nombres que lo contienen
+      vocab:     palabra -> ids de nombres que la contienen (para busqueda tolerante a errores)
+    """
+    if "Site" not in df.columns:
+        return {"names": [], "norm": [], "splits": [], "positions": {}, "grams": {}, "vocab": {}}
+
+    valid = df["Site"].notna().to_numpy()
+    display = as_text(df["Site"]).str.strip()
+    norm = display.str.lower()
+    pos = np.flatnonzero(valid)
+
+    names = list(dict.fromkeys(display.to_numpy()[pos].tolist()))
+    names_norm = [n.lower() for n in names]
+
+    positions = {k: pos[np.asarray(v)] for k, v in pd.Series(pos).groupby(norm.to_numpy()[pos]).indices.items()}
+
+    splits = [frozenset()] * len(names_norm)
+    if "Split" in df.columns:
+        pairs = pd.DataFrame({"n": norm.to_numpy()[pos], "s": df["Split"].to_numpy()[pos]}).dropna().drop_duplicates()
+        by_norm = pairs.groupby("n")["s"].agg(lambda v: frozenset(int(x) for x in v))
+        splits = [by_norm.get(n, frozenset()) for n in names_norm]
+
+    grams: dict[str, set[int]] = {}
+    vocab: dict[str, set[int]] = {}
+    for i, n in enumerate(names_norm):
+        for g in _ngrams(n):
+            grams.setdefault(g, set()).add(i)
+        for t in _tokens(n):
+            vocab.setdefault(t, set()).add(i)
+
+    return {
+        "names": names,
+        "norm": names_norm,
+        "splits": splits,
+        "positions": positions,
+        "grams": {g: frozenset(ids) for g, ids in grams.items()},
+        "vocab": {t: frozenset(ids) for t, ids in vocab.items()},
+    }
+
+def _candidate_ids(index: dict, q: str) -> list[int]:
+    # Ids de nombres que contienen q (substring), en orden de aparicion.
+    names_norm = index["norm"]
+    if len(q) < NGRAM:
+        return [i for i, n in enumerate(names_norm) if q in n]
+    posting = sorted((index["grams"].get(g, frozenset()) for g in _ngrams(q)), key=len)
+    ids = set(posting[0]).intersection(*posting[1:])
+    return [i for i in sorted(ids) if q in names_norm[i]]
+
+def _positions_for(df: pd.DataFrame, index: dict, name_norm: str, split: int | None) -> np.ndarray:
+    pos = index["positions"].get(name_norm, np.empty(0, dtype=np.int64))
+    if split is not None and len(pos) and "Split" in df.columns:
+        pos = pos[(df["Split"].iloc[pos] == split).fillna(False).to_numpy()]
+    return pos
+
+def suggest_sites(df: pd.DataFrame, query: str, limit: int = 30, index: dict | None = None, split: int | None = None) -> list[str]:
     q = query.strip().lower()
+    if index is not None:
+        if not q:
+            return []
+        ids = _candidate_ids(index, q)
+        if split is not None:
+            ids = [i for i in ids if split in index["splits"][i]]
+        return [index["names"][i] for i in ids[:limit]]
+
     if not q or "Site" not in df.columns:
         return []
 
-    sites = df["Site"].dropna().astype(str).str.strip()
+    sites = as_text(df["Site"].dropna()).str.strip()
     mask = sites.str.lower().str.contains(q, na=False, regex=False)
     unique = list(dict.fromkeys(sites[mask].tolist()))
     return unique[:limit]
 
-def search_site_exact(df: pd.DataFrame, site_name: str, limit: int = 50) -> pd.DataFrame:
+def _levenshtein(a: str, b: str, max_dist: int) -> int:
+    # Distancia de edicion acotada: devuelve max_dist + 1 en cuanto se pasa del limite.
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev = cur
+    return prev[-1]
+
+def _token_similarity(q: str, tok: str) -> float:
+    if tok == q:
+        return 1.0
+    if tok.startswith(q):
+        return 0.95
+    if len(q) < 3:
+        return 0.0
+    max_dist = 1 if len(q) <= 4 else 2
+    # Filtro barato: cada letra de q que no aparece en la palabra cuesta al menos una edicion.
+    if len(set(q).difference(tok)) > max_dist:
+        return 0.0
+    # Compara contra la palabra completa y contra su prefijo (el operador puede no haber terminado de escribir).
+    d = min(_levenshtein(q, tok, max_dist), _levenshtein(q, tok[:len(q)], max_dist))
+    if d > max_dist:
+        return 0.0
+    return 1.0 - d / (len(q) + 1)
+
+def rank_sites(query: str, index: dict, limit: int = 30, split: int | None = None) -> list[str]:
+    """
+    Sugerencias ordenadas por relevancia, tolerantes a errores de tipeo ("Atwel", "Audii").
+    Orden: exacto > empieza con > alguna palabra empieza con > contiene > aproximado por palabras.
+    """
+    q = query.strip().lower()
+    if not q:
+        return []
+    names_norm = index["norm"]
+
+    scores: dict[int, float] = {}
+    for i in _candidate_ids(index, q):
+        n = names_norm[i]
+        if n == q:
+            scores[i] = 3.0
+        elif n.startswith(q):
+            scores[i] = 2.5
+        elif any(t.startswith(q) for t in _tokens(n)):
+            scores[i] = 2.2
+        else:
+            scores[i] = 2.0
+
+    # Aproximado: cada palabra de la consulta contra el vocabulario (cientos de palabras, no miles de filas).
+    q_tokens = _tokens(q)
+    if q_tokens:
+        total: dict[int, float] = {}
+        for qt in q_tokens:
+            best: dict[int, float] = {}
+            for tok, ids in index["vocab"].items():
+                sim = _token_similarity(qt, tok)
+                if sim <= 0:
+                    continue
+                for i in ids:
+                    if sim > best.get(i, 0.0):
+                        best[i] = sim
+            for i, sim in best.items():
+                total[i] = total.get(i, 0.0) + sim
+        for i, acc in total.items():
+            score = acc / len(q_tokens)
+            if i not in scores and score >= FUZZY_MIN_SCORE:
+                scores[i] = score
+
+    ids = scores
+    if split is not None:
+        ids = {i: sc for i, sc in scores.items() if split in index["splits"][i]}
+    ranked = sorted(ids, key=lambda i: (-ids[i], len(names_norm[i]), i))
+    return [index["names"][i] for i in ranked[:limit]]
+
+def rank_sites_in_split(query: str, index: dict, split: int, limit: int = 200) -> tuple[list[str], str | None]:
+    """
+    Sugerencias para el split actual con respaldo en el resto del archivo. Devuelve (sitios, respaldo):
+      respaldo None:     sitios del split
+      respaldo "vacio":  el split no tiene coincidencias; sitios de todo el archivo
+      respaldo "fuzzy":  el split solo tiene coincidencias aproximadas y el archivo tiene literales
+                         (una coincidencia literal en otro split no queda oculta por una aproximada)
+    """
+    q = query.strip().lower()
+    in_split = rank_sites(query, index, limit=limit, split=split)
+    if any(q in s.lower() for s in in_split):
+        return in_split, None
+    in_file = rank_sites(query, index, limit=limit)
+    if not in_split:
+        return in_file, "vacio" if in_file else None
+    if any(q in s.lower() for s in in_file):
+        return in_file, "fuzzy"
+    return in_split, None
+
+def search_site_exact(df: pd.DataFrame, site_name: str, limit: int = 50, index: dict | None = None, split: int | None = None) -> pd.DataFrame:
     name = site_name.strip().lower()
     if not name or "Site" not in df.columns:
         return df.iloc[0:0].copy()
 
-    f = df.copy()
-    f["__site_norm__"] = f["Site"].astype(str).str.lower().str.strip()
-    matches = f[f["__site_norm__"] == name].copy()
+    if index is not None:
+        # df debe ser el mismo frame sobre el que se construyo el indice.
+        pos = _positions_for(df, index, name, split)[:limit]
+        return _project_search_cols(df.iloc[pos]).reset_index(drop=True)
+
+    site_norm = as_text(df["Site"]).str.lower().str.strip()
+    matches = df[site_norm == name]
     matches = _project_search_cols(matches).head(limit).reset_index(drop=True)
     return matches
 
-def search_sites_in_base(df: pd.DataFrame, query: str, limit: int = 50) -> pd.DataFrame:
+def search_sites_in_base(df: pd.DataFrame, query: str, limit: int = 50, index: dict | None = None, split: int | None = None) -> pd.DataFrame:
     q = query.strip().lower()
     if not q or "Site" not in df.columns:
         return df.iloc[0:0].copy()
 
-    f = df.copy()
-    f["__site_norm__"] = f["Site"].astype(str).str.lower().str.strip()
-    matches = f[f["__site_norm__"].str.contains(q, na=False, regex=False)].copy()
+    if index is not None:
+        parts = [_positions_for(df, index, index["norm"][i], split) for i in _candidate_ids(index, q)]
+        pos = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        return _project_search_cols(df.iloc[pos[:limit]]).reset_index(drop=True)
+
+    site_norm = as_text(df["Site"]).str.lower().str.strip()
+    matches = df[site_norm.str.contains(q, na=False, regex=False)]
     matches = _project_search_cols(matches).head(limit).reset_index(drop=True)
     return matches
 
-def enrich_with_important_info(matches: pd.DataFrame, important: pd.DataFrame) -> pd.DataFrame:
+def build_important_lookup(important: pd.DataFrame | None) -> dict[str, dict]:
+    # Important Info! como diccionario: SITES (strip) -> registro. Si un sitio se repite, gana el primero.
+    if important is None or important.empty or "SITES" not in important.columns:
+        return {}
+    lookup: dict[str, dict] = {}
+    keys = as_text(important["SITES"]).str.strip().tolist()
+    for key, record in zip(keys, important.to_dict("records")):
+        lookup.setdefault(key, record)
+    return lookup
+
+def prejoin_important_cameras(base: pd.DataFrame, lookup: dict[str, dict]) -> pd.DataFrame:
+    # Completa Gates/Entrances/LPR/PTZ/Important Cameras vacios en Flat Base con los de Important Info!.
+    # Los valores que ya trae Flat Base se respetan.
+    if not lookup or "Site" not in base.columns:
+        return base
+    keys = as_text(base["Site"]).str.strip()
+    filled = {}
+    for imp_col, base_col in IMPORTANT_TO_BASE.items():
+        if base_col not in base.columns:
+            continue
+        values = {}
+        for k, r in lookup.items():
+            v = r.get(imp_col)
+            if v is not None and not pd.isna(v) and str(v).strip():
+                values[k] = str(v).strip()
+        if values:
+            col = base[base_col]
+            # Solo se usan los valores de las celdas vacias.
+            fill = keys.map(values).where(col.isna().to_numpy())
+            if isinstance(col.dtype, pd.CategoricalDtype):
+                # Columnas categoricas de la carga: where no acepta valores que no sean categorias.
+                new = pd.Index(fill.dropna().unique()).difference(col.cat.categories)
+                if len(new):
+                    col = col.cat.add_categories(new)
+            filled[base_col] = col.where(col.notna(), fill)
+    return base.assign(**filled) if filled else base
+
+def enrich_with_important_info(matches: pd.DataFrame, important: pd.DataFrame, lookup: dict[str, dict] | None = None) -> pd.DataFrame:
     """
     Important Info! usa columnas tipo:
       SITES, GATES, ENTRANCES, LPR GATES, PTZ, IMPORTANT CAMERAS, NOTES, ID, SIG TOOLS...
+    Con lookup (build_important_lookup) el join es un acceso a diccionario por fila, sin merge.
     """
+    if lookup is not None:
+        if not lookup or "Site" not in matches.columns:
+            return matches
+        cols = list(next(iter(lookup.values())).keys())
+        rows = [lookup.get(str(site).strip(), {}) for site in matches["Site"].tolist()]
+        extra = pd.DataFrame.from_records(rows, columns=cols, index=matches.index)
+        extra = extra.rename(columns={c: f"{c}_IMP" for c in cols if c in matches.columns})
+        return pd.concat([matches, extra], axis=1)
+
     if important is None or important.empty or "SITES" not in important.columns:
         return matches
 
     imp = important.copy()
     imp.columns = [str(c).strip() for c in imp.columns]
-    imp["__site_norm__"] = imp["SITES"].astype(str).str.strip()
+    imp["__site_norm__"] = as_text(imp["SITES"]).str.strip()
 
     # Merge por nombre de site (string exacto)
     out = matches.copy()
-    out["__site_norm__"] = out["Site"].astype(str).str.strip()
+    out["__site_norm__"] = as_text(out["Site"]).str.strip()
 
     merged = out.merge(imp, how="left", on="__site_norm__", suffixes=("", "_IMP"))
 
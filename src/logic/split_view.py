@@ -1,8 +1,47 @@
 from __future__ import annotations
+import numpy as np
 import pandas as pd
 import re
 
-def get_splits(df: pd.DataFrame) -> list[int]:
+HOUR_RANK_COL = "__hour_rank__"
+_HOUR_RE = r"(\d{1,2})\s*:\s*(\d{2})\s*([AP])\.?M\.?"
+URL_COLS = ["SIG Tools", "Map"]
+NO_TOURS_TAG = "(NO TOURS)"
+
+def partition_by_split_station(df: pd.DataFrame) -> pd.DataFrame:
+    # Orden estable por (Split, Station[, hora]): cada particion queda contigua y ya ordenada por hora.
+    if not {"Split", "Station"}.issubset(df.columns):
+        return df
+    by = ["Split", "Station"] + ([HOUR_RANK_COL] if HOUR_RANK_COL in df.columns else [])
+    return df.sort_values(by, kind="stable", na_position="last").reset_index(drop=True)
+
+def build_split_index(df: pd.DataFrame) -> dict:
+    """
+    Indice de particiones sobre un df ya ordenado con partition_by_split_station:
+      parts:    (split, station) -> slice de filas
+      by_split: split -> slice de filas
+      splits:   lista ordenada de splits
+    """
+    parts: dict[tuple[int, int], slice] = {}
+    by_split: dict[int, slice] = {}
+    if {"Split", "Station"}.issubset(df.columns):
+        for (sp, stn), pos in df.groupby(["Split", "Station"], sort=False).indices.items():
+            parts[(int(sp), int(stn))] = slice(int(pos[0]), int(pos[-1]) + 1)
+        for sp, pos in df.groupby("Split", sort=False).indices.items():
+            by_split[int(sp)] = slice(int(pos[0]), int(pos[-1]) + 1)
+    return {"parts": parts, "by_split": by_split, "splits": sorted(by_split)}
+
+def split_rows(df: pd.DataFrame, split: int, index: dict | None = None) -> pd.DataFrame:
+    # Filas de un split; con indice es un corte contiguo (sin escanear ni copiar).
+    if index is not None:
+        return df.iloc[index["by_split"].get(int(split), slice(0, 0))]
+    if "Split" not in df.columns:
+        return df
+    return df[df["Split"] == split]
+
+def get_splits(df: pd.DataFrame, index: dict | None = None) -> list[int]:
+    if index is not None:
+        return list(index["splits"])
     if "Split" not in df.columns:
         return []
     vals = df["Split"].dropna().unique().tolist()
@@ -13,6 +52,11 @@ def get_stations_for_split(df: pd.DataFrame, split: int) -> list[int]:
     # Regla simple: stations van de 1..split
     return list(range(1, int(split) + 1))
 
+def as_text(s: pd.Series) -> pd.Series:
+    # Texto por fila. Las columnas de texto de la carga son categoricas y astype(str) directo falla
+    # con una serie vacia (pandas 2.2 + numpy 2): se pasa por object.
+    return s.astype(object).astype(str)
+
 def _hour_sort_key(x) -> tuple[int, int, int, str]:
     # Intenta ordenar "9:00 P.M.", "4:00 A.M.", y "24 Hrs"
     if x is None:
@@ -23,7 +67,7 @@ def _hour_sort_key(x) -> tuple[int, int, int, str]:
         return (0, 0, 0, s)
 
     # parse "H:MM A.M." / "H:MM P.M."
-    m = re.search(r"(\d{1,2})\s*:\s*(\d{2})\s*([AP])\.?M\.?", s, re.IGNORECASE)
+    m = re.search(_HOUR_RE, s, re.IGNORECASE)
     if not m:
         return (5, 99, 99, s)
 
@@ -43,11 +87,84 @@ def _hour_sort_key(x) -> tuple[int, int, int, str]:
 
     return (1, hh24, mm, s)
 
-def build_split_view(df: pd.DataFrame, split: int, station: int, extended: bool) -> pd.DataFrame:
-    f = df[(df["Split"] == split) & (df["Station"] == station)].copy()
+def _hour_sort_keys(hours: pd.Series) -> pd.Series:
+    # _hour_sort_key por fila. Con Hour categorica se evalua una vez por categoria (map sobre la
+    # serie devolveria una categorica de tuplas) y cada fila toma el puesto de su categoria.
+    if not isinstance(hours.dtype, pd.CategoricalDtype):
+        return hours.map(_hour_sort_key)
+    keys = [_hour_sort_key(c) for c in hours.cat.categories] + [_hour_sort_key(None)]
+    order = sorted(range(len(keys)), key=keys.__getitem__)
+    rank = np.empty(len(keys), dtype=np.int64)
+    rank[order] = np.arange(len(keys))
+    # El codigo -1 (nulo) toma la ultima posicion: la llave de None.
+    return pd.Series(rank[hours.cat.codes.to_numpy()], index=hours.index)
+
+def hour_rank(hours: pd.Series) -> pd.Series:
+    """
+    Version vectorizada de _hour_sort_key: devuelve un entero por fila cuyo orden
+    coincide con el de las tuplas (grupo, hh24, mm, texto) de _hour_sort_key.
+    """
+    is_null = hours.isna().to_numpy()
+    txt = as_text(hours).str.strip()
+    txt = txt.where(~is_null, "")
+
+    m = txt.str.extract(_HOUR_RE, flags=re.IGNORECASE)
+    parsed = m[0].notna().to_numpy()
+    hh = pd.to_numeric(m[0], errors="coerce").fillna(0).astype(int).to_numpy()
+    mm = pd.to_numeric(m[1], errors="coerce").fillna(0).astype(int).to_numpy()
+    is_am = (m[2].str.upper() == "A").fillna(False).to_numpy()
+    has_24 = txt.str.contains("24", regex=False).to_numpy()
+
+    hh24 = np.where(is_am, np.where(hh == 12, 0, hh), np.where(hh == 12, 12, hh + 12))
+    group = np.select(
+        [is_null, has_24, ~parsed, is_am],
+        [9, 0, 5, 2],
+        default=1,
+    )
+    # "24 Hrs" -> (0, 0, 0); sin formato reconocible o nulo -> (g, 99, 99)
+    hh24 = np.select([is_null | ~parsed, has_24], [99, 0], default=hh24)
+    mm = np.select([is_null | ~parsed, has_24], [99, 0], default=mm)
 
-    if "Hour" in f.columns:
-        f = f.sort_values(by="Hour", key=lambda s: s.map(_hour_sort_key))
+    keys = pd.DataFrame({"n": group * 10000 + hh24 * 100 + mm, "s": txt.to_numpy()}, index=hours.index)
+    return keys.groupby(["n", "s"], sort=True).ngroup().astype("int32")
+
+def url_or_none(values: pd.Series) -> np.ndarray:
+    # Links http/https (sin espacios) o None; se evalua una vez por valor unico.
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    txt = pd.Series(uniques, dtype=object).astype(str).str.strip()
+    ok = txt.str.lower().str.startswith(("http://", "https://")).to_numpy(dtype=bool)
+    cleaned = np.append(np.where(ok, txt.to_numpy(dtype=object), None), None)
+    return cleaned[codes]
+
+def no_tours_flags(sites: pd.Series) -> np.ndarray:
+    codes, uniques = pd.factorize(sites, use_na_sentinel=True)
+    hit = pd.Series(uniques, dtype=object).astype(str).str.upper().str.contains(NO_TOURS_TAG, regex=False)
+    return np.append(hit.to_numpy(dtype=bool), False)[codes]
+
+def build_render_flags(df: pd.DataFrame) -> dict:
+    """
+    Datos de presentacion calculados al cargar, alineados por posicion con Flat Base:
+      no_tours: True si el Site trae "(NO TOURS)"
+      urls:     columna -> link valido o None (la tabla muestra solo links que se pueden abrir)
+    """
+    return {
+        "no_tours": no_tours_flags(df["Site"]) if "Site" in df.columns else np.zeros(len(df), dtype=bool),
+        "urls": {c: url_or_none(df[c]) for c in URL_COLS if c in df.columns},
+    }
+
+def add_hour_rank(df: pd.DataFrame) -> pd.DataFrame:
+    if "Hour" not in df.columns:
+        return df
+    return df.assign(**{HOUR_RANK_COL: hour_rank(df["Hour"])})
+
+def build_split_view(df: pd.DataFrame, split: int, station: int, extended: bool, index: dict | None = None) -> pd.DataFrame:
+    if index is not None:
+        # Las particiones ya vienen ordenadas por hora desde la carga: no hay que ordenar.
+        f = df.iloc[index["parts"].get((int(split), int(station)), slice(0, 0))]
+    else:
+        f = df[(df["Split"] == split) & (df["Station"] == station)]
+        if "Hour" in f.columns:
+            f = f.sort_values(by="Hour", key=_hour_sort_keys)
 
     if extended:
         cols = [
@@ -59,3 +176,33 @@ def build_split_view(df: pd.DataFrame, split: int, station: int, extended: bool)
 
     cols = [c for c in cols if c in f.columns]
     return f[cols].reset_index(drop=True)
+
+def build_split_overview(df: pd.DataFrame, split: int, index: dict | None = None) -> pd.DataFrame:
+    """
+    Split completo como pivote Hora x Station: una fila por hora (en el orden de la vista de split)
+    y una columna por station con sus sitios separados por " | ". Sale de un solo groupby sobre
+    las filas del split, sin armar una vista por station.
+    """
+    stations = get_stations_for_split(df, split)
+    columns = ["Hour"] + [f"Station {s}" for s in stations]
+    rows = split_rows(df, split, index=index)
+    if rows.empty or not {"Station", "Site"}.issubset(rows.columns):
+        return pd.DataFrame(columns=columns)
+    if HOUR_RANK_COL not in rows.columns:
+        rows = add_hour_rank(rows) if "Hour" in rows.columns else rows.assign(**{HOUR_RANK_COL: 0})
+
+    frame = pd.DataFrame(
+        {
+            "rank": rows[HOUR_RANK_COL].to_numpy(),
+            "Hour": rows["Hour"].astype(object).where(rows["Hour"].notna(), "-").to_numpy() if "Hour" in rows.columns else "-",
+            "Station": rows["Station"].to_numpy(),
+            "Site": as_text(rows["Site"].astype(object).where(rows["Site"].notna(), "")).str.strip().to_numpy(),
+        }
+    ).dropna(subset=["Station"])
+    frame = frame[frame["Site"] != ""]
+    # Dentro de cada celda los sitios quedan en el orden de la vista (las particiones ya vienen ordenadas).
+    cells = frame.groupby(["rank", "Hour", "Station"], sort=True)["Site"].agg(" | ".join)
+    pivot = cells.unstack("Station")
+    pivot.columns = [f"Station {int(s)}" for s in pivot.columns]
+    pivot = pivot.reset_index(level="Hour").reset_index(drop=True)
+    return pivot.reindex(columns=columns).fillna("")
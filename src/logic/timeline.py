@@ -0,0 +1,146 @@
+from __future__ import annotations
+import re
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from src.logic.split_view import _HOUR_RE
+
+# Las horas del Excel (Hour, Drop time, SUNDAY (D.T.)) ya vienen en el reloj de la central
+# (un sitio PT que arranca 9 P.M. local aparece como 12:00 A.M.); Time es solo la zona del sitio.
+# Se cuentan minutos desde el mediodia para que una noche de turno (8 P.M. -> 6 A.M.) sea creciente.
+NIGHT_MINUTES = 24 * 60
+_NOON = 12 * 60
+ALL_NIGHT = -1   # "24 Hrs" / "24H"
+NO_TIME = -2     # "-", "0", nulo o texto sin hora
+
+TIMELINE_COLS = ["Station", "Hour", "Time", "Site", "ID", "Drop time", "SUNDAY (D.T.)"]
+
+def clock_minutes(value) -> int:
+    # "9:00 P.M." -> 1260 (minutos desde medianoche); "24 Hrs" -> ALL_NIGHT; sin hora -> NO_TIME
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return NO_TIME
+    s = str(value).strip()
+    if "24" in s and ":" not in s:
+        return ALL_NIGHT
+    m = re.search(_HOUR_RE, s, re.IGNORECASE)
+    if not m:
+        return NO_TIME
+    hh, mm = int(m.group(1)) % 12, int(m.group(2))
+    if m.group(3).upper() == "P":
+        hh += 12
+    return hh * 60 + mm
+
+def night_minute(minutes: int) -> int:
+    return (minutes - _NOON) % NIGHT_MINUTES
+
+def _column_minutes(s: pd.Series) -> np.ndarray:
+    # Se parsea una vez por valor unico y se reparte por codigo (el -1 de los nulos cae en el NO_TIME final).
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    per_unique = np.array([clock_minutes(u) for u in uniques] + [NO_TIME], dtype=np.int32)
+    return per_unique[codes]
+
+def _interval_ends(starts: np.ndarray, drop: np.ndarray, fallback: np.ndarray | None = None) -> np.ndarray:
+    # Fin del intervalo en minutos de noche: entre start+1 y start+24h (un drop "1:00 P.M." pasa del mediodia).
+    ends = starts + (night_minute(drop) - starts - 1) % NIGHT_MINUTES + 1
+    missing = drop < 0
+    if fallback is not None:
+        ends = np.where(missing, fallback, ends)
+    else:
+        # Sin drop time el sitio se considera activo hasta el mediodia.
+        ends = np.where(missing, NIGHT_MINUTES, ends)
+    return ends.astype(np.int32)
+
+def _interval_index(rows: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Indice de intervalos de una station: bounds son los instantes donde cambia el conjunto
+    de sitios activos; los activos del tramo [bounds[i], bounds[i+1]) son
+    rows[offsets[i]:offsets[i+1]] (formato CSR, sin listas de Python).
+    """
+    bounds = np.unique(np.concatenate([starts, ends])).astype(np.int32)
+    active = (starts[None, :] <= bounds[:, None]) & (ends[None, :] > bounds[:, None])
+    offsets = np.concatenate([[0], np.cumsum(active.sum(axis=1))]).astype(np.int32)
+    return bounds, offsets, rows[np.nonzero(active)[1]]
+
+def build_timeline(base: pd.DataFrame, split_index: dict) -> dict:
+    """
+    Modelo de intervalos por fila de Flat Base, calculado al cargar el dataset:
+      start:  minuto de noche en que arranca cada fila (-1 si no tiene horario)
+      end:    {"normal", "sunday"} -> minuto de noche del drop (sunday usa SUNDAY (D.T.))
+      parts:  (split, station) -> {"normal", "sunday"} -> (bounds, offsets, rows)
+    """
+    n = len(base)
+    empty = {"start": np.full(n, -1, dtype=np.int32), "end": {}, "parts": {}}
+    if "Hour" not in base.columns or not split_index.get("parts"):
+        return empty
+
+    hour = _column_minutes(base["Hour"])
+    drop = _column_minutes(base["Drop time"]) if "Drop time" in base.columns else np.full(n, NO_TIME, np.int32)
+    sunday = _column_minutes(base["SUNDAY (D.T.)"]) if "SUNDAY (D.T.)" in base.columns else np.full(n, NO_TIME, np.int32)
+
+    all_night = hour == ALL_NIGHT
+    scheduled = hour != NO_TIME
+    starts = np.where(all_night, 0, night_minute(hour)).astype(np.int32)
+    ends_normal = np.where(all_night, NIGHT_MINUTES, _interval_ends(starts, drop))
+    ends_sunday = np.where(all_night, NIGHT_MINUTES, _interval_ends(starts, sunday, fallback=ends_normal))
+    ends = {"normal": ends_normal.astype(np.int32), "sunday": ends_sunday.astype(np.int32)}
+
+    parts: dict[tuple[int, int], dict] = {}
+    for key, sl in split_index["parts"].items():
+        rows = np.arange(sl.start, sl.stop, dtype=np.int32)
+        rows = rows[scheduled[rows]]
+        if not len(rows):
+            continue
+        parts[key] = {v: _interval_index(rows, starts[rows], e[rows]) for v, e in ends.items()}
+
+    return {"start": np.where(scheduled, starts, -1).astype(np.int32), "end": ends, "parts": parts}
+
+def _night_variant(night_date) -> str:
+    # La noche que empieza el sabado termina el domingo: aplica SUNDAY (D.T.).
+    return "sunday" if night_date.weekday() == 5 else "normal"
+
+def _lookup(entry: tuple[np.ndarray, np.ndarray, np.ndarray], minute: int) -> np.ndarray:
+    bounds, offsets, rows = entry
+    i = int(np.searchsorted(bounds, minute, side="right")) - 1
+    if i < 0:
+        return rows[0:0]
+    return rows[offsets[i]:offsets[i + 1]]
+
+def active_rows(timeline: dict, split: int, station: int, at: datetime) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Filas de Flat Base activas en (split, station) a la hora `at` y los minutos que les quedan.
+    Dos busquedas binarias: la noche en curso y la cola de la noche anterior (drops despues del mediodia).
+    """
+    part = timeline["parts"].get((int(split), int(station)))
+    if part is None:
+        empty = np.empty(0, dtype=np.int32)
+        return empty, empty
+    minute = night_minute(at.hour * 60 + at.minute)
+    night = (at - timedelta(minutes=_NOON)).date()
+    prev = night - timedelta(days=1)
+
+    cur_v, prev_v = _night_variant(night), _night_variant(prev)
+    cur_rows = _lookup(part[cur_v], minute)
+    prev_rows = _lookup(part[prev_v], minute + NIGHT_MINUTES)
+    rows = np.concatenate([prev_rows, cur_rows])
+    left = np.concatenate(
+        [
+            timeline["end"][prev_v][prev_rows] - (minute + NIGHT_MINUTES),
+            timeline["end"][cur_v][cur_rows] - minute,
+        ]
+    )
+    order = np.argsort(rows, kind="stable")
+    return rows[order], left[order]
+
+def station_now(df: pd.DataFrame, timeline: dict, split: int, station: int, at: datetime) -> pd.DataFrame:
+    # Sitios que la station deberia estar viendo a la hora `at`, en el orden de la vista de split.
+    rows, left = active_rows(timeline, split, station, at)
+    cols = [c for c in TIMELINE_COLS if c in df.columns]
+    out = df.iloc[rows][cols].reset_index(drop=True)
+    return out.assign(**{"Min. restantes": left})
+
+def split_now(df: pd.DataFrame, timeline: dict, split: int, at: datetime) -> pd.DataFrame:
+    # Todas las stations del split (1..split) concatenadas.
+    parts = [station_now(df, timeline, split, stn, at) for stn in range(1, int(split) + 1)]
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,104 @@
+from __future__ import annotations
+import re
+import numpy as np
+import pandas as pd
+
+from src.logic.split_view import HOUR_RANK_COL, as_text
+
+CAMERA_COLS = ["Gates", "Entrances", "LPR", "PTZ", "Important Cameras"]
+METRIC_COLS = ["Sitios"] + CAMERA_COLS
+
+def _count_items(value) -> int:
+    # "2, 6, 10" -> 3; "17, 23 & 18" -> 3; "-" -> 0
+    parts = re.split(r"[,&]", str(value))
+    return sum(1 for p in parts if p.strip() and p.strip() != "-")
+
+def camera_counts(s: pd.Series) -> np.ndarray:
+    # Cuenta sobre los valores unicos de la columna y reparte por codigo (sin parsear fila por fila).
+    codes, uniques = pd.factorize(s, use_na_sentinel=True)
+    per_unique = np.array([_count_items(u) for u in uniques], dtype=np.int32)
+    out = np.zeros(len(s), dtype=np.int32)
+    if len(per_unique):
+        valid = codes >= 0
+        out[valid] = per_unique[codes[valid]]
+    return out
+
+def build_workload_cube(base: pd.DataFrame) -> dict:
+    """
+    Agregados de carga calculados una vez por carga de dataset:
+      stations: indice (Split, Station) -> Sitios, camaras por tipo, Horarios
+      hourly:   indice (Split, Station, Hour) -> Sitios y camaras, ordenado por hora
+      hours:    split -> horas del split en el orden de la vista de split
+    """
+    empty = {"stations": pd.DataFrame(columns=METRIC_COLS), "hourly": pd.DataFrame(columns=METRIC_COLS), "hours": {}}
+    if not {"Split", "Station", "Site"}.issubset(base.columns):
+        return empty
+    rows = base.dropna(subset=["Split", "Station", "Site"])
+    if rows.empty:
+        return empty
+
+    frame = pd.DataFrame(
+        {
+            "Split": rows["Split"].astype(int).to_numpy(),
+            "Station": rows["Station"].astype(int).to_numpy(),
+            "Hour": rows["Hour"].astype(object).where(rows["Hour"].notna(), "-").to_numpy() if "Hour" in rows.columns else "-",
+            "rank": rows[HOUR_RANK_COL].to_numpy() if HOUR_RANK_COL in rows.columns else 0,
+            "Site": as_text(rows["Site"]).str.strip().to_numpy(),
+        }
+    )
+    for c in CAMERA_COLS:
+        frame[c] = camera_counts(rows[c]) if c in rows.columns else 0
+
+    # Un sitio repetido en la misma station/hora cuenta una vez (Flat Base trae filas duplicadas).
+    frame = frame.drop_duplicates(subset=["Split", "Station", "Hour", "Site"])
+    sums = {c: (c, "sum") for c in CAMERA_COLS}
+
+    hourly = frame.groupby(["Split", "Station", "Hour"], sort=False).agg(
+        Sitios=("Site", "size"), rank=("rank", "min"), **sums
+    )
+    hourly = hourly.sort_values(["Split", "Station", "rank"]).astype("int32")
+
+    per_station = frame.drop_duplicates(subset=["Split", "Station", "Site"])
+    stations = per_station.groupby(["Split", "Station"]).agg(Sitios=("Site", "size"), **sums)
+    stations["Horarios"] = hourly.groupby(level=["Split", "Station"]).size()
+
+    hour_rank = frame.groupby(["Split", "Hour"], sort=False)["rank"].min().sort_values()
+    hours: dict[int, list] = {}
+    for split_value, hour in hour_rank.index:
+        hours.setdefault(int(split_value), []).append(hour)
+    return {"stations": stations.astype("int32"), "hourly": hourly, "hours": hours}
+
+def station_load(cube: dict, split: int, metric: str = "Sitios") -> pd.DataFrame:
+    # Totales por station para un split (1..split, con ceros si una station no tiene sitios).
+    # "Desvio %" es el de la metrica elegida respecto de su promedio entre stations.
+    stations = cube["stations"]
+    if split not in stations.index.get_level_values("Split"):
+        out = pd.DataFrame(0, index=pd.RangeIndex(1, int(split) + 1, name="Station"), columns=list(stations.columns))
+    else:
+        out = stations.xs(split, level="Split").reindex(range(1, int(split) + 1), fill_value=0)
+        out.index.name = "Station"
+    mean = out[metric].mean()
+    out["Desvio %"] = ((out[metric] - mean) / mean * 100).round(1) if mean else 0.0
+    return out.reset_index()
+
+def hourly_density(cube: dict, split: int, metric: str = "Sitios") -> pd.DataFrame:
+    # Pivote Hour x Station de un split, con las horas en el orden de la vista de split.
+    hourly = cube["hourly"]
+    if split not in hourly.index.get_level_values("Split"):
+        return pd.DataFrame()
+    part = hourly.xs(split, level="Split")
+    pivot = part[metric].unstack("Station", fill_value=0).reindex(cube["hours"].get(int(split), []))
+    pivot = pivot.reindex(columns=range(1, int(split) + 1), fill_value=0)
+    pivot.columns = [f"Station {c}" for c in pivot.columns]
+    return pivot
+
+def imbalance_summary(load: pd.DataFrame, metric: str = "Sitios") -> dict:
+    values = load[metric]
+    mean = float(values.mean()) if len(values) else 0.0
+    return {
+        "max": int(values.max()) if len(values) else 0,
+        "min": int(values.min()) if len(values) else 0,
+        "mean": round(mean, 1),
+        # Coeficiente de variacion: 0 = carga perfectamente pareja.
+        "cv": round(float(values.std(ddof=0)) / mean * 100, 1) if mean else 0.0,
+    }
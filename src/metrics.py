@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Registro de metricas del proceso: lo comparten todas las sesiones de Streamlit, el warm-up,
+# el watcher y la API. Solo stdlib: se puede importar desde cualquier modulo sin costo de arranque.
+#
+#   msplits_stage_seconds{stage=...}   duracion de cada etapa (carga, parseo, indices, vistas, reruns)
+#   msplits_stage_rows_total{stage=...} filas procesadas por etapa
+#   msplits_cache_total{cache=..., result="hit"|"miss"}
+#   msplits_excel_fallback_total{result="ok"|"error"}  lecturas via copia temporal (PermissionError)
+PREFIX = "msplits_"
+MAX_SAMPLES = 512     # muestras recientes por serie para calcular percentiles
+MAX_EVENTS = 5000     # eventos recientes para exportar en JSON lines
+
+_LOCK = threading.Lock()
+_COUNTERS: dict[tuple[str, tuple], float] = {}
+_STAGES: dict[tuple, dict] = {}
+_EVENTS: deque = deque(maxlen=MAX_EVENTS)
+_STARTED_AT = time.time()
+_REVISION = 0         # sube con cada registro: identifica el contenido del registro para exportarlo
+
+def _labels(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    global _REVISION
+    key = (name, _labels(labels))
+    with _LOCK:
+        _REVISION += 1
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + value
+        _EVENTS.append({"ts": time.time(), "metric": name, "labels": dict(key[1]), "value": value})
+
+def cache_result(cache: str, hit: bool, **labels) -> None:
+    inc("cache_total", cache=cache, result="hit" if hit else "miss", **labels)
+
+def observe(stage: str, seconds: float, rows: int | None = None, **labels) -> None:
+    global _REVISION
+    key = _labels({"stage": stage, **labels})
+    with _LOCK:
+        _REVISION += 1
+        s = _STAGES.get(key)
+        if s is None:
+            s = _STAGES[key] = {"count": 0, "sum": 0.0, "max": 0.0, "rows": 0, "samples": deque(maxlen=MAX_SAMPLES)}
+        s["count"] += 1
+        s["sum"] += seconds
+        s["max"] = max(s["max"], seconds)
+        s["rows"] += rows or 0
+        s["samples"].append(seconds)
+        _EVENTS.append({"ts": time.time(), "metric": "stage_seconds", "labels": dict(key), "value": seconds, "rows": rows})
+
+@contextmanager
+def timed(stage: str, **labels):
+    """
+    Mide el bloque como una etapa. El bloque puede informar filas procesadas:
+        with timed("parse", file=name) as m:
+            ...
+            m["rows"] = len(df)
+    """
+    info: dict = {"rows": None}
+    t0 = time.perf_counter()
+    try:
+        yield info
+    finally:
+        observe(stage, time.perf_counter() - t0, rows=info["rows"], **labels)
+
+def _quantile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def snapshot() -> dict:
+    # Copia consistente del registro (para la pagina de metricas y los exportadores).
+    with _LOCK:
+        counters = [{"metric": n, **dict(lbl), "value": v} for (n, lbl), v in _COUNTERS.items()]
+        stages = []
+        for lbl, s in _STAGES.items():
+            ordered = sorted(s["samples"])
+            stages.append(
+                {
+                    **dict(lbl),
+                    "count": s["count"],
+                    "sum": s["sum"],
+                    "max": s["max"],
+                    "p50": _quantile(ordered, 0.5),
+                    "p95": _quantile(ordered, 0.95),
+                    "rows": s["rows"],
+                }
+            )
+    return {"started_at": _STARTED_AT, "counters": counters, "stages": stages}
+
+def _prom_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items())) + "}"
+
+def export_prometheus() -> str:
+    # Formato de texto de Prometheus (exposition format 0.0.4).
+    snap = snapshot()
+    lines = []
+    by_name: dict[str, list[dict]] = {}
+    for c in snap["counters"]:
+        by_name.setdefault(c["metric"], []).append(c)
+    for name, items in sorted(by_name.items()):
+        lines.append(f"# TYPE {PREFIX}{name} counter")
+        for c in items:
+            labels = {k: v for k, v in c.items() if k not in ("metric", "value")}
+            lines.append(f"{PREFIX}{name}{_prom_labels(labels)} {c['value']:g}")
+
+    stage_fields = ("count", "sum", "max", "p50", "p95", "rows")
+    lines.append(f"# TYPE {PREFIX}stage_seconds summary")
+    for s in snap["stages"]:
+        labels = {k: v for k, v in s.items() if k not in stage_fields}
+        for q, field in (("0.5", "p50"), ("0.95", "p95")):
+            lines.append(f"{PREFIX}stage_seconds{_prom_labels({**labels, 'quantile': q})} {s[field]:.6f}")
+        lines.append(f"{PREFIX}stage_seconds_sum{_prom_labels(labels)} {s['sum']:.6f}")
+        lines.append(f"{PREFIX}stage_seconds_count{_prom_labels(labels)} {s['count']}")
+    lines.append(f"# TYPE {PREFIX}stage_rows_total counter")
+    for s in snap["stages"]:
+        labels = {k: v for k, v in s.items() if k not in stage_fields}
+        lines.append(f"{PREFIX}stage_rows_total{_prom_labels(labels)} {s['rows']}")
+    return "\n".join(lines) + "\n"
+
+def export_jsonl() -> str:
+    # Un evento por linea (los ultimos MAX_EVENTS), para analizar fuera de la app.
+    with _LOCK:
+        events = list(_EVENTS)
+    return "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in events)
+
+def revision() -> tuple[float, int]:
+    # Cambia cada vez que cambia el registro (incluido un reset).
+    with _LOCK:
+        return _STARTED_AT, _REVISION
+
+def reset() -> None:
+    global _STARTED_AT
+    with _LOCK:
+        _COUNTERS.clear()
+        _STAGES.clear()
+        _EVENTS.clear()
+        _STARTED_AT = time.time()
+_REVISION = 0         # sube con cada registro: identifica el contenido del registro para exportarlo
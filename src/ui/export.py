@@ -0,0 +1,97 @@
+from __future__ import annotations
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable
+
+import streamlit as st
+
+from src.metrics import cache_result, timed
+
+# Archivos de descarga ya armados, compartidos por todas las sesiones. La llave incluye la version
+# del Excel: al recargarlo las entradas viejas dejan de pedirse y salen por LRU (tope en bytes).
+MAX_EXPORT_BYTES = 64 * 2**20
+
+_LOCK = threading.Lock()
+_EXPORTS: OrderedDict[tuple, bytes] = OrderedDict()
+_SIZE = 0
+
+def cached_export(key: tuple) -> bytes | None:
+    with _LOCK:
+        data = _EXPORTS.get(key)
+        if data is not None:
+            _EXPORTS.move_to_end(key)
+    return data
+
+def build_export(key: tuple, kind: str, build: Callable[[], tuple[bytes, int]]) -> bytes:
+    # build() -> (bytes, filas escritas). Solo se llama si el archivo no estaba armado.
+    global _SIZE
+    data = cached_export(key)
+    cache_result("export", data is not None)
+    if data is not None:
+        return data
+    with timed("export", kind=kind) as m:
+        data, m["rows"] = build()
+    with _LOCK:
+        if key not in _EXPORTS:
+            _EXPORTS[key] = data
+            _SIZE += len(data)
+        while _SIZE > MAX_EXPORT_BYTES and len(_EXPORTS) > 1:
+            _, old = _EXPORTS.popitem(last=False)
+            _SIZE -= len(old)
+    return data
+
+def export_button(label: str, file_name: str, mime: str, key: tuple, build: Callable[[], tuple[bytes, int]], kind: str) -> None:
+    """
+    Descarga perezosa: st.download_button necesita los bytes al pintarse, asi que mientras el archivo
+    no este armado se muestra "Preparar ..." y se arma solo cuando alguien lo pide.
+    """
+    widget_key = "export_" + hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:12]
+    data = cached_export(key)
+    if data is None:
+        if not st.button(f"Preparar {label}", key=f"{widget_key}_prep"):
+            return
+        with st.spinner(f"Armando {file_name}..."):
+            data = build_export(key, kind, build)
+    st.download_button(f"Descargar {label}", data=data, file_name=file_name, mime=mime, key=widget_key)
+
+def split_export_buttons(tables: dict, split: int, station: int | None, extended: bool) -> None:
+    # CSV de la station en pantalla (si hay una) y exportes de todo el split (XLSX con una hoja por station o zip de CSV).
+    from src.logic.export import XLSX_MIME, frame_csv, split_xlsx, split_zip
+    from src.logic.split_view import build_split_view
+
+    version = tables.get("version")
+    view_tag = "ext" if extended else "base"
+    c_csv, c_xlsx, c_zip = st.columns([1, 1, 1])
+    if station is not None:
+        with c_csv:
+            def station_csv() -> tuple[bytes, int]:
+                view = build_split_view(tables["base"], split, station, extended, index=tables.get("split_index"))
+                return frame_csv(view), len(view)
+
+            export_button(
+                f"CSV station {station}",
+                f"split_{split}_station_{station}.csv",
+                "text/csv",
+                (version, "station_csv", split, station, extended),
+                station_csv,
+                kind="station_csv",
+            )
+    with c_xlsx:
+        export_button(
+            f"XLSX split {split}",
+            f"split_{split}_{view_tag}.xlsx",
+            XLSX_MIME,
+            (version, "split_xlsx", split, extended),
+            lambda: split_xlsx(tables, split, extended),
+            kind="split_xlsx",
+        )
+    with c_zip:
+        export_button(
+            f"ZIP CSV split {split}",
+            f"split_{split}_{view_tag}.zip",
+            "application/zip",
+            (version, "split_zip", split, extended),
+            lambda: split_zip(tables, split, extended),
+            kind="split_zip",
+        )
@@ -1,32 +1,16 @@
 from __future__ import annotations
 import streamlit as st
-import re
+import os
+import time
+from datetime import datetime
+from src.config import config_datasets, config_problems, dataset_config
+from src.metrics import observe
 
 SEASON_LABELS = {
     "nov_mar": "NOV -> MAR",
     "mar_nov": "MAR -> NOV",
 }
 
-def _infer_dataset_season(dataset_key: str, dataset_cfg: dict) -> str | None:
-    text = " ".join(
-        [
-            str(dataset_key or ""),
-            str(dataset_cfg.get("label", "")),
-            str(dataset_cfg.get("file", "")),
-        ]
-    ).lower()
-    text = text.replace("–", "-").replace("—", "-")
-
-    if re.search(r"\bnov\s*(?:->|to|-|a)?\s*mar\b", text):
-        return "nov_mar"
-    if re.search(r"\bmar\s*(?:->|to|-|a)?\s*nov\b", text):
-        return "mar_nov"
-    if "nov_mar" in text:
-        return "nov_mar"
-    if "mar_nov" in text:
-        return "mar_nov"
-    return None
-
 def inject_base_css():
     st.markdown(
         """
@@ -46,21 +30,24 @@ def sidebar_app_dataset_picker(cfg: dict):
         st.sidebar.error("No hay apps definidas en config/apps.yml")
         return
 
+    problems = config_problems(cfg)
+    if problems:
+        with st.sidebar.expander(f"Avisos de apps.yml ({len(problems)})", expanded=False):
+            for p in problems:
+                st.caption(p)
+
     # Selector unico de archivo Excel (sin exponer selector de app).
-    # Cada opcion representa una combinacion (app_key, dataset_key).
-    excel_options = []
-    for a_key, a_cfg in apps.items():
-        datasets = a_cfg.get("datasets", {}) or {}
-        for d_key, d_cfg in datasets.items():
-            excel_options.append(
-                {
-                    "id": f"{a_key}::{d_key}",
-                    "app_key": a_key,
-                    "dataset_key": d_key,
-                    "label": f'{a_cfg.get("label", a_key)} - {d_cfg.get("label", d_key)}',
-                    "season": _infer_dataset_season(d_key, d_cfg),
-                }
-            )
+    # Cada opcion representa una combinacion (app_key, dataset_key); la temporada viene del parse de apps.yml.
+    excel_options = [
+        {
+            "id": ds.id,
+            "app_key": ds.app_key,
+            "dataset_key": ds.dataset_key,
+            "label": ds.full_label,
+            "season": ds.season,
+        }
+        for ds in config_datasets(cfg)
+    ]
 
     if not excel_options:
         st.sidebar.warning("No hay archivos de Excel configurados en apps.yml.")
@@ -124,18 +111,108 @@ def sidebar_season_switcher():
         format_func=lambda s: SEASON_LABELS.get(s, s),
     )
 
-def download_button_df(df, filename: str):
+def load_tables_progressive(cfg: dict, app_key: str, dataset_key: str) -> dict:
+    # En frio (recien desplegado, Excel sin snapshot) muestra un aviso mientras se cargan las tablas;
+    # pandas y el loader se importan aqui, despues de pintar el titulo y el selector.
+    from src.data.excel_loader import dataset_loaded, load_dataset_tables
+
+    if dataset_loaded(cfg, app_key, dataset_key):
+        return load_dataset_tables(cfg, app_key, dataset_key)
+    placeholder = st.empty()
+    with placeholder.container():
+        with st.spinner(f"Cargando {dataset_config(cfg, app_key, dataset_key).full_label}..."):
+            tables = load_dataset_tables(cfg, app_key, dataset_key)
+    placeholder.empty()
+    return tables
+
+def _megabytes(usage: dict[str, int] | None) -> float | None:
+    if usage is None:
+        return None
+    return round(sum(usage.values()) / 2**20, 2)
+
+def sidebar_warmup_status(cfg: dict):
+    # Progreso del warm-up en segundo plano y tiempos de carga por dataset.
+    from src.data.excel_loader import dataset_memory
+    from src.data.store import memory_report
+    from src.data.warmup import warmup_status
+
+    items = warmup_status()
+    if not items:
+        return
+    done = sum(1 for i in items if i["state"] in ("ok", "error"))
+    state_labels = {"pending": "en cola", "loading": "cargando", "ok": "listo", "error": "error"}
+
+    rows = []
+    for i in items:
+        rows.append(
+            {
+                "Archivo": dataset_config(cfg, i["app_key"], i["dataset_key"]).full_label,
+                "Estado": state_labels.get(i["state"], i["state"]),
+                "Segundos": round(i["seconds"], 2) if i["seconds"] is not None else None,
+                "MB": _megabytes(dataset_memory(cfg, i["app_key"], i["dataset_key"])),
+            }
+        )
+
+    with st.sidebar.expander(f"Precarga de datos ({done}/{len(items)})", expanded=False):
+        st.progress(done / len(items))
+        st.dataframe(rows, hide_index=True, use_container_width=True)
+        total = sum(r["total"] for r in memory_report())
+        st.caption(f"Memoria de tablas compartidas por todas las sesiones: {total / 2**20:.1f} MB")
+        errors = [i for i in items if i["error"]]
+        for i in errors:
+            st.caption(f'{i["id"]}: {i["error"]}')
+
+def sidebar_dataset_changes(app_key: str, dataset_key: str):
+    # Aviso cuando el watcher recargo el Excel activo, con las filas que cambiaron.
+    from src.data.watcher import dataset_changes
+
+    changes = dataset_changes(app_key, dataset_key)
+    if not changes:
+        return
+    last = changes[0]
+    summary = ", ".join(f"{n} {kind}" for kind, n in sorted(last["summary"].items())) or "sin cambios de filas"
+    st.sidebar.info(f'Archivo actualizado a las {last["at"]:%H:%M}: {summary}.')
+    if not last["diff"].empty:
+        with st.sidebar.expander("Ver filas cambiadas", expanded=False):
+            st.dataframe(last["diff"], hide_index=True, use_container_width=True)
+
+RERUN_HISTORY = 30
+
+def debug_enabled() -> bool:
+    # Panel de depuracion: ?debug=1 en la URL o MSPLITS_DEBUG=1 al lanzar streamlit.
+    return st.query_params.get("debug") == "1" or os.environ.get("MSPLITS_DEBUG") == "1"
+
+def rerun_started() -> float:
+    return time.perf_counter()
+
+def record_rerun(scope: str, started: float) -> None:
+    # Guarda en la sesion (y en src.metrics) cuanto tardo un rerun de la pagina ("pagina") o de un fragmento.
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    observe("rerun", elapsed_ms / 1000, scope=scope)
+    history = st.session_state.setdefault("_rerun_times", [])
+    history.append({"Hora": datetime.now().strftime("%H:%M:%S"), "Alcance": scope, "ms": round(elapsed_ms, 1)})
+    del history[:-RERUN_HISTORY]
+    if debug_enabled() and scope not in ("pagina", "shell"):
+        st.caption(f"Rerun de {scope}: {elapsed_ms:.1f} ms")
+
+def sidebar_rerun_debug():
+    # Historial de reruns de la sesion (se refresca en cada rerun completo de la pagina).
+    if not debug_enabled():
+        return
+    history = st.session_state.get("_rerun_times", [])
+    with st.sidebar.expander("Debug: tiempos de rerun", expanded=True):
+        st.dataframe(list(reversed(history)), hide_index=True, use_container_width=True)
+
+def download_button_df(df, filename: str, key: tuple):
+    # key identifica el contenido (version del Excel + seleccion): el CSV se arma solo al pedirlo
+    # y queda cacheado para los reruns y las demas sesiones.
     import pandas as pd
+    from src.logic.export import frame_csv
+    from src.ui.export import export_button
+
     if df is None or getattr(df, "empty", True):
         return
     if not isinstance(df, pd.DataFrame):
         return
 
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button(
-        label="?????? Descargar CSV",
-        data=csv,
-        file_name=filename,
-        mime="text/csv",
-        use_container_width=False,
-    )
+    export_button("CSV", filename, "text/csv", ("df", filename, *key), lambda: (frame_csv(df), len(df)), kind="csv")
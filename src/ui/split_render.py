@@ -0,0 +1,135 @@
+from __future__ import annotations
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import streamlit as st
+
+from src.logic.ha import HA_FLAG_COL
+from src.logic.split_view import build_split_overview, build_split_view
+from src.metrics import cache_result, timed
+
+NO_TOURS_STYLE = "color: #c1121f; font-weight: 700;"
+MAX_RENDERS = 256
+OVERVIEW_BLOCK = 10      # stations por bloque en la vista de split completo
+OVERVIEW_HEIGHT = 600    # alto fijo: la grilla solo dibuja las filas visibles
+
+# Tablas de Split View ya preparadas, compartidas por todas las sesiones.
+# La llave incluye la version del Excel: al recargarlo, las entradas viejas dejan de usarse y salen por LRU.
+_LOCK = threading.Lock()
+_RENDERS: OrderedDict[tuple, dict] = OrderedDict()
+
+_TEXT_WIDTHS = {
+    "Hour": "small",
+    "Time": "small",
+    "Site": "large",
+    "Drop time": "small",
+    "SUNDAY (D.T.)": "small",
+    "Gates": "small",
+    "Entrances": "small",
+    "LPR": "small",
+    "PTZ": "small",
+    "Important Cameras": "medium",
+    "Notes*": "small",
+}
+
+def _column_config(cols: tuple[str, ...]) -> dict:
+    config = {c: st.column_config.TextColumn(c, width=w) for c, w in _TEXT_WIDTHS.items()}
+    config["ID"] = st.column_config.NumberColumn("ID", width="small")
+    config["SIG Tools"] = st.column_config.LinkColumn("SIG Tools", width="small")
+    config["Map"] = st.column_config.LinkColumn("Map", width="small")
+    config[HA_FLAG_COL] = st.column_config.CheckboxColumn(HA_FLAG_COL, width="small", help="El sitio tambien esta en el reparto H.A. de este split y station")
+    return {k: v for k, v in config.items() if k in cols}
+
+def prepared_split_view(tables: dict, split: int, station: int, extended: bool, ha: dict | None = None) -> dict:
+    """
+    Tabla lista para mostrar de (dataset, split, station, vista[, con marca H.A.]):
+      display:       DataFrame con los links ya validados
+      site_css:      estilo por fila de la columna Site (alerta NO TOURS)
+      no_tours:      cantidad de sitios NO TOURS
+      column_config: configuracion de columnas de st.dataframe
+      height:        alto de la tabla sin scroll interno
+    """
+    key = (tables.get("version"), int(split), int(station), bool(extended), ha is not None)
+    with _LOCK:
+        entry = _RENDERS.get(key)
+        if entry is not None:
+            _RENDERS.move_to_end(key)
+    cache_result("split_render", entry is not None)
+    if entry is not None:
+        return entry
+
+    with timed("split_view") as m:
+        split_index = tables.get("split_index")
+        view = build_split_view(tables["base"], split=split, station=station, extended=extended, index=split_index)
+        # Las banderas vienen de la carga, alineadas con Flat Base: la vista es un corte contiguo de ella.
+        rows = split_index["parts"].get((int(split), int(station)), slice(0, 0))
+        flags = tables["render_flags"]
+        display = view.assign(**{c: flags["urls"][c][rows] for c in flags["urls"] if c in view.columns})
+        if ha is not None:
+            # La marca viene del modelo H.A., alineada con Flat Base igual que las banderas.
+            display = display.assign(**{HA_FLAG_COL: ha["base_flag"][rows]})
+        no_tours = flags["no_tours"][rows]
+
+        entry = {
+            "display": display,
+            "site_css": np.where(no_tours, NO_TOURS_STYLE, ""),
+            "no_tours": int(no_tours.sum()),
+            "column_config": _column_config(tuple(display.columns)),
+            # Sin tope superior: evita scroll interno en la tabla y deja el scroll en la pagina.
+            "height": max(360, 36 * (len(display) + 1)),
+        }
+        m["rows"] = len(display)
+    with _LOCK:
+        _RENDERS[key] = entry
+        while len(_RENDERS) > MAX_RENDERS:
+            _RENDERS.popitem(last=False)
+    return entry
+
+def styled_split_view(entry: dict):
+    # Styler nuevo por render (Streamlit lo muta al serializar); el estilo ya viene calculado.
+    display = entry["display"]
+    if "Site" not in display.columns:
+        return display
+    return display.style.apply(lambda _: entry["site_css"], subset=["Site"], axis=0)
+
+def prepared_split_overview(tables: dict, split: int) -> dict:
+    """
+    Split completo (pivote Hora x Station) listo para mostrar, por (dataset, split):
+      display: DataFrame Hour + una columna por station, sin Styler
+      blocks:  bloques de columnas de OVERVIEW_BLOCK stations ("Stations 1-10" -> columnas)
+      sites:   station -> cantidad de sitios
+    """
+    key = (tables.get("version"), "overview", int(split))
+    with _LOCK:
+        entry = _RENDERS.get(key)
+        if entry is not None:
+            _RENDERS.move_to_end(key)
+    cache_result("split_overview", entry is not None)
+    if entry is not None:
+        return entry
+
+    with timed("split_overview") as m:
+        split_index = tables.get("split_index")
+        display = build_split_overview(tables["base"], split, index=split_index)
+        station_cols = [c for c in display.columns if c != "Hour"]
+        blocks = {}
+        for start in range(0, len(station_cols), OVERVIEW_BLOCK):
+            cols = station_cols[start:start + OVERVIEW_BLOCK]
+            blocks[f"{cols[0]} - {cols[-1].removeprefix('Station ')}"] = ["Hour"] + cols
+        parts = split_index["parts"] if split_index is not None else {}
+        sites = {int(c.removeprefix("Station ")): 0 for c in station_cols}
+        for (sp, stn), rows in parts.items():
+            if sp == int(split) and stn in sites:
+                sites[stn] = rows.stop - rows.start
+        config = {"Hour": st.column_config.TextColumn("Hour", width="small")}
+        for c in station_cols:
+            n = sites[int(c.removeprefix("Station "))]
+            config[c] = st.column_config.TextColumn(f"{c} ({n})", width="medium", help=f"{n} sitios en {c}")
+        entry = {"display": display, "blocks": blocks, "sites": sites, "column_config": config}
+        m["rows"] = len(display)
+    with _LOCK:
+        _RENDERS[key] = entry
+        while len(_RENDERS) > MAX_RENDERS:
+            _RENDERS.popitem(last=False)
+    return entry
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from src.logic.split_view import build_split_index
+from src.logic.change_split import compare_splits_for_station
+
+def _base() -> pd.DataFrame:
+    # Forma de la carga: ordenado por Split/Station y con Site categorico.
+    df = pd.DataFrame(
+        {
+            "Split": [1, 1, 1, 1, 2, 2, 2],
+            "Station": [1, 1, 2, 2, 1, 1, 1],
+            "Hour": ["6:00 P.M."] * 7,
+            "Site": ["Alpha", "Beta ", "Gamma", None, "Alpha", "Delta", None],
+            "Notes*": ["x", None, None, None, None, "y", None],
+        }
+    )
+    df["Site"] = df["Site"].astype("category")
+    return df
+
+def test_compare_with_index_matches_scan():
+    df = _base()
+    index = build_split_index(df)
+    for a, b, st in [(1, 2, 1), (2, 1, 1), (1, 2, 2), (1, 3, 1), (3, 4, 1)]:
+        plain = compare_splits_for_station(df, a, b, st)
+        fast = compare_splits_for_station(df, a, b, st, index=index)
+        assert plain[0].equals(fast[0]) and plain[1].equals(fast[1])
+
+def test_compare_added_and_removed():
+    added, removed = compare_splits_for_station(_base(), 1, 2, 1, index=build_split_index(_base()))
+    assert added["Site"].tolist() == ["Delta"]
+    assert removed["Site"].tolist() == ["Beta "]
+    assert "Split" not in added.columns
@@ -0,0 +1,88 @@
+from __future__ import annotations
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.config import project_root
+from src.logic.split_view import _hour_sort_key, _hour_sort_keys, hour_rank
+
+WORKBOOKS = sorted((project_root() / "data" / "excel").rglob("*.xlsx"))
+HEADER_ROWS = 3  # Flat Base trae el encabezado en la fila 1, la hoja H.A. en la 2
+
+def _workbook_hours(path: Path) -> list:
+    # Valores de la columna Hour de todas las hojas del libro, tal como los entrega openpyxl.
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        values = []
+        for ws in wb.worksheets:
+            rows = ws.iter_rows(values_only=True)
+            col = None
+            for _, row in zip(range(HEADER_ROWS), rows):
+                names = [str(c).strip() if c is not None else "" for c in row]
+                if "Hour" in names:
+                    col = names.index("Hour")
+                    break
+            if col is None:
+                continue
+            values += [row[col] if col < len(row) else None for row in rows]
+        return values
+    finally:
+        wb.close()
+
+def _assert_same_order(values: list) -> None:
+    # hour_rank tiene que ordenar igual que _hour_sort_key: mismo orden y empates en los mismos valores.
+    s = pd.Series(values, dtype=object)
+    ranks = hour_rank(s).to_numpy()
+    keys = [_hour_sort_key(None if pd.isna(v) else v) for v in values]
+    for i in range(len(values)):
+        for j in range(len(values)):
+            assert (keys[i] < keys[j]) == (ranks[i] < ranks[j]), (values[i], values[j])
+
+@pytest.mark.parametrize("path", WORKBOOKS, ids=lambda p: p.name)
+def test_hour_rank_matches_sort_key_on_workbook(path: Path):
+    values = _workbook_hours(path)
+    assert values, f"{path.name} no tiene columna Hour"
+    # Los valores distintos alcanzan: el rango de una fila depende solo de su valor.
+    unique = list(dict.fromkeys(None if pd.isna(v) else v for v in values))
+    _assert_same_order(unique)
+
+def test_hour_rank_empty():
+    assert len(hour_rank(pd.Series([], dtype=object))) == 0
+    assert len(hour_rank(pd.Series(pd.Categorical([])))) == 0
+
+def test_hour_rank_edge_cases():
+    _assert_same_order(
+        [
+            "9:00 P.M.",
+            "12:00 P.M.",         # mediodia: primera hora P.M.
+            "12:30 A.M.",         # pasada la medianoche: despues de todas las P.M.
+            "1:00 A.M.",
+            "4:00 a.m.",
+            "11:59 P.M.",
+            "24 Hrs",
+            "  8:00 P.M.  ",
+            "8:00 P.M.",
+            "TBD",
+            "",
+            None,
+            np.nan,
+        ]
+    )
+
+def test_hour_rank_past_midnight_goes_last():
+    s = pd.Series(["1:00 A.M.", "11:00 P.M.", "12:00 A.M.", "6:00 P.M.", "24 Hrs"])
+    ordered = s.iloc[np.argsort(hour_rank(s).to_numpy(), kind="stable")].tolist()
+    assert ordered == ["24 Hrs", "6:00 P.M.", "11:00 P.M.", "12:00 A.M.", "1:00 A.M."]
+
+def test_categorical_hours_sort_like_object():
+    # Las columnas de texto de la carga son categoricas: mismo orden que con texto plano.
+    values = ["1:00 A.M.", "8:00 P.M.", None, "TBD", "24 Hrs", "8:00 P.M."]
+    cat = pd.Series(pd.Categorical(values))
+    obj = pd.Series(values, dtype=object)
+    assert hour_rank(cat).tolist() == hour_rank(obj).tolist()
+    by_key = np.argsort(_hour_sort_keys(cat).to_numpy(), kind="stable").tolist()
+    assert by_key == np.argsort(hour_rank(obj).to_numpy(), kind="stable").tolist()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from src.logic.site_search import build_important_lookup, prejoin_important_cameras
+
+def _cat(values: list) -> pd.Series:
+    # Las columnas de texto de Flat Base llegan categoricas desde el loader.
+    return pd.Series(pd.Categorical(values))
+
+def _important(rows: list[dict]) -> dict[str, dict]:
+    return build_important_lookup(pd.DataFrame(rows))
+
+def test_fills_blank_with_value_that_is_not_a_category():
+    base = pd.DataFrame({"Site": _cat(["A", "B"]), "Gates": _cat(["2, 6", None])})
+    lookup = _important([{"SITES": "B", "GATES": "17, 23 & 18"}])
+    out = prejoin_important_cameras(base, lookup)
+    assert out["Gates"].tolist() == ["2, 6", "17, 23 & 18"]
+    assert isinstance(out["Gates"].dtype, pd.CategoricalDtype)
+
+def test_fills_blanks_on_loader_shaped_frame():
+    base = pd.DataFrame(
+        {
+            "Site": _cat(["(DT) Alpha", "(DT) Beta ", "(DT) Gamma", None]),
+            "Gates": _cat(["1", None, None, None]),
+            "PTZ": _cat([None, None, "3", None]),
+        }
+    )
+    lookup = _important(
+        [
+            {"SITES": "(DT) Beta", "GATES": "4, 5", "PTZ": " 2 "},
+            {"SITES": "(DT) Gamma", "GATES": "1", "PTZ": "-"},
+        ]
+    )
+    out = prejoin_important_cameras(base, lookup)
+    # El nombre del sitio se compara sin espacios; el valor de Important Info! tambien se limpia.
+    assert out["Gates"].tolist()[:3] == ["1", "4, 5", "1"]
+    assert pd.isna(out["PTZ"].iloc[0]) and out["PTZ"].tolist()[1:3] == ["2", "3"]
+    # Sitio nulo: no se completa nada.
+    assert pd.isna(out["Gates"].iloc[3]) and pd.isna(out["PTZ"].iloc[3])
+
+def test_keeps_existing_flat_base_values():
+    base = pd.DataFrame({"Site": _cat(["A", "B"]), "Gates": _cat(["2, 6", "9"]), "LPR": _cat(["1", None])})
+    lookup = _important([{"SITES": "A", "GATES": "99", "LPR GATES": "7"}, {"SITES": "B", "GATES": "98", "LPR GATES": "8"}])
+    out = prejoin_important_cameras(base, lookup)
+    assert out["Gates"].tolist() == ["2, 6", "9"]
+    assert out["LPR"].tolist() == ["1", "8"]
+    assert list(out["Gates"].cat.categories) == list(base["Gates"].cat.categories)
+
+def test_without_lookup_returns_same_frame():
+    base = pd.DataFrame({"Site": _cat(["A"]), "Gates": _cat([None])})
+    assert prejoin_important_cameras(base, {}) is base
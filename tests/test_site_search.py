@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import pandas as pd
+
+from src.logic.site_search import build_site_index, rank_sites_in_split
+
+def _index() -> dict:
+    # Frame con la forma del loader: Split/Station Int64 y Site categorica.
+    df = pd.DataFrame(
+        {
+            "Split": pd.array([4, 4, 5, 5], dtype="Int64"),
+            "Station": pd.array([1, 2, 1, 2], dtype="Int64"),
+            "Site": pd.Series(pd.Categorical(["(DT) Atwell Ford", "(AS) Audi Central", "(DT) Atwel Motors", "(AS) Audi Central"])),
+        }
+    )
+    return build_site_index(df)
+
+def test_literal_match_in_split_is_kept():
+    assert rank_sites_in_split("audi", _index(), 5) == (["(AS) Audi Central"], None)
+
+def test_literal_in_other_split_beats_fuzzy_in_current_split():
+    # En el split 5 "atwell" solo encuentra "Atwel Motors" por aproximacion; el archivo tiene "Atwell Ford".
+    sites, fallback = rank_sites_in_split("atwell", _index(), 5)
+    assert fallback == "fuzzy"
+    assert sites[0] == "(DT) Atwell Ford"
+
+def test_empty_split_falls_back_to_file():
+    sites, fallback = rank_sites_in_split("ford", _index(), 5)
+    assert (sites, fallback) == (["(DT) Atwell Ford"], "vacio")
+
+def test_no_matches_anywhere():
+    assert rank_sites_in_split("zzz", _index(), 4) == ([], None)